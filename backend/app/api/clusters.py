@@ -1,20 +1,44 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict, Any
 from pydantic import BaseModel
-from datetime import datetime, timedelta
-import yaml
-import json
-from pathlib import Path
+import asyncio
+import hashlib
+import orjson
+import time
+from collections import OrderedDict
 
 from app.core.config import settings
-from app.core.ssh_manager import SSHManager
+from app.core.cluster_config import load_clusters_config
+from app.core.ssh_manager import SSHTarget, ssh_pool
+from app.api.dependencies import get_cluster_or_404, get_ssh_target
 
 router = APIRouter()
 
-# Simple in-memory cache for GPU availability
-# Format: {cluster_name: (data, timestamp)}
-gpu_cache: Dict[str, tuple] = {}
+# Simple in-memory LRU cache for GPU availability
+# Format: {cluster_name: ((data, etag), time.monotonic() timestamp)}, data is never mutated
+gpu_cache: "OrderedDict[str, tuple]" = OrderedDict()
 GPU_CACHE_DURATION = 60  # seconds
+CACHE_MAX_ENTRIES = 64  # per cache, least recently used entries are evicted
+
+# Partitions from sinfo or picked up alongside GPU availability refreshes
+# Format: {cluster_name: (partitions, time.monotonic() timestamp)}
+partitions_cache: "OrderedDict[str, tuple]" = OrderedDict()
+PARTITIONS_CACHE_DURATION = 300  # seconds, partitions rarely change
+
+# GPU availability refreshes also list partitions in the same SSH command,
+# so opening the launch form needs a single round-trip per cluster.
+# Assumes check_gpu_availability.py is in the home directory on the cluster.
+SNAPSHOT_SEPARATOR = "---MLOPS-SNAPSHOT---"
+SNAPSHOT_COMMAND = (
+    "python3 ~/check_gpu_availability.py --json; "
+    f"echo \"{SNAPSHOT_SEPARATOR} $?\"; "
+    "sinfo -o %P --noheader"
+)
+
+# Per-cluster locks so concurrent cache misses trigger a single SSH refresh.
+# Shared by GPU and partition refreshes since one fills the other's cache.
+cluster_locks: Dict[str, asyncio.Lock] = {}
 
 
 # Pydantic schemas
@@ -54,10 +78,7 @@ async def list_clusters():
     Get list of configured clusters from clusters.yaml.
     """
     try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = config.get('clusters', [])
-            return clusters
+        return load_clusters_config().clusters
     except FileNotFoundError:
         raise HTTPException(
             status_code=500,
@@ -67,234 +88,268 @@ async def list_clusters():
         raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
 
 
+def _run_on_cluster(cluster: Dict[str, Any], target: SSHTarget, command: str):
+    """
+    Run a single command on a cluster over its pooled SSH connection.
+
+    Blocking (paramiko), so endpoints call it through run_in_threadpool
+    to keep the event loop free while waiting on the network.
+
+    Returns:
+        Tuple of (stdout, stderr, exit_code)
+    """
+    # Use login shell if cluster requires it (for environment setup)
+    return ssh_pool.execute_command(
+        *target,
+        command=command,
+        use_login_shell=cluster.get('use_login_shell', False)
+    )
+
+
+def _parse_partitions(sinfo_output: str) -> List[str]:
+    """Parse `sinfo -o %P` output (remove asterisks which indicate default partition)."""
+    partitions = (line.strip().rstrip('*') for line in sinfo_output.split('\n'))
+    # dict.fromkeys dedups while keeping sinfo's order
+    return list(dict.fromkeys(p for p in partitions if p))
+
+
+def _fetch_cluster_snapshot(cluster: Dict[str, Any], target: SSHTarget):
+    """
+    Fetch GPU availability and partitions from a cluster in one SSH command.
+
+    Returns:
+        Tuple of (gpu_stdout, gpu_exit_code, partitions, stderr).
+        partitions is None if sinfo failed.
+    """
+    stdout, stderr, exit_code = _run_on_cluster(cluster, target, SNAPSHOT_COMMAND)
+
+    gpu_stdout, sep, rest = stdout.partition(SNAPSHOT_SEPARATOR)
+    if not sep:
+        # Shell never reached the separator, treat the whole run as a failed script
+        return stdout, exit_code or 1, None, stderr
+
+    status_line, _, sinfo_stdout = rest.partition('\n')
+    try:
+        gpu_exit_code = int(status_line.strip())
+    except ValueError:
+        gpu_exit_code = 1
+
+    partitions = _parse_partitions(sinfo_stdout) if exit_code == 0 else None
+    return gpu_stdout, gpu_exit_code, partitions, stderr
+
+
+def _cache_get(cache: OrderedDict, key: str, ttl: int):
+    """
+    Look up a fresh entry in one of the TTL caches above.
+
+    Returns:
+        Tuple of (value, age_seconds), or None on a miss. Expired entries are dropped.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        return None
+
+    value, cached_time = entry
+    age = time.monotonic() - cached_time
+    if age >= ttl:
+        del cache[key]
+        return None
+
+    cache.move_to_end(key)
+    return value, age
+
+
+def _cache_put(cache: OrderedDict, key: str, value: Any) -> None:
+    """Store an entry in one of the TTL caches above, evicting the least recently used."""
+    cache[key] = (value, time.monotonic())
+    cache.move_to_end(key)
+    while len(cache) > CACHE_MAX_ENTRIES:
+        cache.popitem(last=False)
+
+
+def _gpu_response(
+    gpu_data: Dict[str, Any],
+    etag: str,
+    age: float,
+    cached: bool,
+    response: Response,
+    if_none_match: str | None
+):
+    """
+    Build a GPU availability response with HTTP caching headers.
+
+    Clients that send back the current ETag get an empty 304 instead of the payload.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"max-age={max(GPU_CACHE_DURATION - int(age), 0)}"
+    }
+    if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    # Return a fresh wrapper with age indicator, never mutate the cached dict
+    return {**gpu_data, 'cached': cached, 'cache_age_seconds': int(age)}
+
+
+def _get_cached_gpu_response(cluster_name: str, response: Response, if_none_match: str | None):
+    """Serve GPU availability from cache if still fresh, else return None."""
+    hit = _cache_get(gpu_cache, cluster_name, GPU_CACHE_DURATION)
+    if hit is None:
+        return None
+
+    (gpu_data, etag), age = hit
+    return _gpu_response(gpu_data, etag, age, True, response, if_none_match)
+
+
 @router.get("/{cluster_name}/gpu-availability")
-async def get_gpu_availability(cluster_name: str) -> Dict[str, Any]:
+async def get_gpu_availability(
+    cluster_name: str,
+    response: Response,
+    if_none_match: str | None = Header(None),
+    cluster: Dict[str, Any] = Depends(get_cluster_or_404),
+    target: SSHTarget = Depends(get_ssh_target)
+):
     """
     Check real-time GPU availability on a cluster.
 
     This endpoint:
     1. Checks cache first (60 second TTL)
-    2. If cache miss, SSHs to the cluster
+    2. If cache miss, SSHs to the cluster (one request per cluster at a time,
+       concurrent requests wait and are served from the refreshed cache)
     3. Runs check_gpu_availability.py --json
     4. Parses JSON output, caches it, and returns GPU availability data
-    """
-    # TODO: For multi-user deployments, add request deduplication to prevent
-    # concurrent SSH connections to the same cluster when multiple users refresh
-    # simultaneously before cache is populated. Could use asyncio.Lock per cluster.
 
+    Responses carry an ETag and a Cache-Control max-age matching the remaining
+    cache lifetime, so polling clients can skip unchanged payloads.
+    """
     # Check cache first
-    if cluster_name in gpu_cache:
-        cached_data, cached_time = gpu_cache[cluster_name]
-        age = (datetime.now() - cached_time).total_seconds()
-        if age < GPU_CACHE_DURATION:
-            # Return cached data with age indicator
-            cached_data['cached'] = True
-            cached_data['cache_age_seconds'] = int(age)
-            return cached_data
-
-    # Get cluster config
-    try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
-
-    if cluster_name not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{cluster_name}' not found")
-
-    cluster = clusters[cluster_name]
+    cached_response = _get_cached_gpu_response(cluster_name, response, if_none_match)
+    if cached_response is not None:
+        return cached_response
+
+    # Only one refresh per cluster in flight; everyone else waits for its result
+    lock = cluster_locks.setdefault(cluster_name, asyncio.Lock())
+    async with lock:
+        # Another request may have refreshed the cache while we were waiting
+        cached_response = _get_cached_gpu_response(cluster_name, response, if_none_match)
+        if cached_response is not None:
+            return cached_response
+
+        # Connect via SSH and run the script (partitions come along for free)
+        try:
+            stdout, exit_code, partitions, stderr = await run_in_threadpool(
+                _fetch_cluster_snapshot, cluster, target
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error connecting to cluster: {str(e)}"
+            )
 
-    # Parse host into username and hostname
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
+        if partitions is not None:
+            _cache_put(partitions_cache, cluster_name, partitions)
 
-    # Connect via SSH and run the script
-    try:
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
-        )
+        if exit_code != 0:
+            raise HTTPException(
+                status_code=500,
+                detail=f"GPU availability script failed: {stderr}"
+            )
 
-        with ssh:
-            # Run the GPU availability script with --json flag
-            # Assumes script is in home directory on cluster
-            # Use login shell if cluster requires it (for environment setup)
-            use_login = cluster.get('use_login_shell', False)
-            stdout, stderr, exit_code = ssh.execute_command(
-                "python3 ~/check_gpu_availability.py --json",
-                use_login_shell=use_login
+        # Parse JSON output
+        try:
+            gpu_data = orjson.loads(stdout)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to parse GPU data: {str(e)}"
             )
 
-            if exit_code != 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"GPU availability script failed: {stderr}"
-                )
-
-            # Parse JSON output
-            try:
-                gpu_data = json.loads(stdout)
-
-                # Filter by allowed_gpu_types if specified
-                if cluster.get('allowed_gpu_types'):
-                    allowed_types = set(cluster['allowed_gpu_types'])
-                    gpu_data['gpus'] = [
-                        gpu for gpu in gpu_data['gpus']
-                        if gpu['gpu_type'] in allowed_types
-                    ]
-                    # Recalculate total_free_gpus after filtering
-                    gpu_data['total_free_gpus'] = sum(
-                        gpu['available'] for gpu in gpu_data['gpus']
-                    )
-
-                # Cache the result
-                gpu_data['cached'] = False
-                gpu_data['cache_age_seconds'] = 0
-                gpu_cache[cluster_name] = (gpu_data.copy(), datetime.now())
-
-                return gpu_data
-            except json.JSONDecodeError as e:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to parse GPU data: {str(e)}"
-                )
+        # Filter by allowed_gpu_types if specified
+        allowed_types = load_clusters_config().allowed_gpu_types.get(cluster_name)
+        if allowed_types:
+            # Filter and recalculate total_free_gpus in a single pass
+            filtered_gpus = []
+            total_free = 0
+            for gpu in gpu_data['gpus']:
+                if gpu['gpu_type'] in allowed_types:
+                    filtered_gpus.append(gpu)
+                    total_free += gpu['available']
+            gpu_data['gpus'] = filtered_gpus
+            gpu_data['total_free_gpus'] = total_free
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error connecting to cluster: {str(e)}"
-        )
+        # Cache the result (without the per-response cache fields)
+        etag = f'"{hashlib.md5(orjson.dumps(gpu_data)).hexdigest()}"'
+        _cache_put(gpu_cache, cluster_name, (gpu_data, etag))
+
+        return _gpu_response(gpu_data, etag, 0, False, response, if_none_match)
 
 
 @router.get("/{cluster_name}/partitions")
-async def get_partitions(cluster_name: str) -> List[str]:
+async def get_partitions(
+    cluster_name: str,
+    cluster: Dict[str, Any] = Depends(get_cluster_or_404)
+) -> List[str]:
     """
     Get available SLURM partitions on a cluster.
     If cluster config has allowed_partitions, filters results.
     Otherwise runs `sinfo -o %P` and returns all partitions.
     """
-    # Get cluster config
-    try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
-
-    if cluster_name not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{cluster_name}' not found")
-
-    cluster = clusters[cluster_name]
-
     # If allowed_partitions is specified, return that
     if cluster.get('allowed_partitions'):
         return cluster['allowed_partitions']
 
-    # Otherwise, query SLURM
-    # Parse host
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
-
-    # Connect and get partitions
-    try:
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
-        )
+    # Check cache first (also filled by GPU availability refreshes)
+    hit = _cache_get(partitions_cache, cluster_name, PARTITIONS_CACHE_DURATION)
+    if hit is not None:
+        return hit[0]
 
-        with ssh:
-            use_login = cluster.get('use_login_shell', False)
-            stdout, stderr, exit_code = ssh.execute_command(
-                "sinfo -o %P --noheader",
-                use_login_shell=use_login
+    # Otherwise, query SLURM
+    target = get_ssh_target(cluster_name, cluster)
+
+    lock = cluster_locks.setdefault(cluster_name, asyncio.Lock())
+    async with lock:
+        # Another request may have refreshed the cache while we were waiting
+        hit = _cache_get(partitions_cache, cluster_name, PARTITIONS_CACHE_DURATION)
+        if hit is not None:
+            return hit[0]
+
+        # Connect and get partitions
+        try:
+            stdout, stderr, exit_code = await run_in_threadpool(
+                _run_on_cluster, cluster, target, "sinfo -o %P --noheader"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error connecting to cluster: {str(e)}"
             )
 
-            if exit_code != 0:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to get partitions: {stderr}"
-                )
-
-            # Parse partition names (remove asterisks which indicate default partition)
-            partitions = []
-            for line in stdout.strip().split('\n'):
-                partition = line.strip().rstrip('*')
-                if partition and partition not in partitions:
-                    partitions.append(partition)
-
-            return partitions
+        if exit_code != 0:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to get partitions: {stderr}"
+            )
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error connecting to cluster: {str(e)}"
-        )
+        partitions = _parse_partitions(stdout)
+        _cache_put(partitions_cache, cluster_name, partitions)
+        return partitions
 
 
 @router.post("/{cluster_name}/test-connection")
-async def test_cluster_connection(cluster_name: str):
+async def test_cluster_connection(
+    cluster_name: str,
+    target: SSHTarget = Depends(get_ssh_target)
+):
     """
     Test SSH connection to a cluster.
-    Attempts to connect and run a simple command.
+    Runs `hostname` over the pooled SSH session and reports the login node that answered.
     """
-    # Get cluster config
-    try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
-
-    if cluster_name not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{cluster_name}' not found")
-
-    cluster = clusters[cluster_name]
-
-    # Parse host
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
-
-    # Test connection
+    # Test connection (no login shell, hostname needs no environment)
     try:
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
+        stdout, stderr, exit_code = await run_in_threadpool(
+            ssh_pool.execute_command, *target, "hostname"
         )
-
-        with ssh:
-            # Run simple test command
-            use_login = cluster.get('use_login_shell', False)
-            stdout, stderr, exit_code = ssh.execute_command(
-                "echo 'MLOps Mission Control connection test' && hostname",
-                use_login_shell=use_login
-            )
-
-            if exit_code == 0:
-                return {
-                    "cluster": cluster_name,
-                    "status": "Connected successfully",
-                    "reachable": True,
-                    "hostname": stdout.strip().split('\n')[-1],
-                    "message": "SSH connection is working correctly"
-                }
-            else:
-                return {
-                    "cluster": cluster_name,
-                    "status": "Connection failed",
-                    "reachable": False,
-                    "error": stderr
-                }
-
     except Exception as e:
         return {
             "cluster": cluster_name,
@@ -302,3 +357,19 @@ async def test_cluster_connection(cluster_name: str):
             "reachable": False,
             "error": str(e)
         }
+
+    if exit_code != 0:
+        return {
+            "cluster": cluster_name,
+            "status": "Connection failed",
+            "reachable": False,
+            "error": stderr
+        }
+
+    return {
+        "cluster": cluster_name,
+        "status": "Connected successfully",
+        "reachable": True,
+        "hostname": stdout.strip().split('\n')[-1],
+        "message": "SSH connection is working correctly"
+    }
@@ -0,0 +1,60 @@
+"""
+Shared lookups for API endpoints.
+
+Routes with a {cluster_name} path parameter use get_cluster_or_404 and
+get_ssh_target as dependencies. Routes that get the cluster from
+elsewhere (e.g. a job row) call them, or get_cluster_and_target, directly.
+"""
+
+from fastapi import Depends, HTTPException
+from typing import Dict, Any, Tuple
+
+from app.core.cluster_config import load_clusters_config
+from app.core.ssh_manager import SSHTarget
+
+
+def get_cluster_or_404(cluster_name: str) -> Dict[str, Any]:
+    """
+    Look up a cluster in the cached cluster config.
+
+    Raises:
+        HTTPException: 500 if the config can't be read, 404 if the cluster is unknown
+    """
+    try:
+        clusters = load_clusters_config()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
+
+    cluster = clusters.by_name.get(cluster_name)
+    if cluster is None:
+        raise HTTPException(status_code=404, detail=f"Cluster '{cluster_name}' not found")
+
+    return cluster
+
+
+def get_ssh_target(
+    cluster_name: str,
+    cluster: Dict[str, Any] = Depends(get_cluster_or_404)
+) -> SSHTarget:
+    """
+    Get the SSH connection parameters for a cluster (parsed from host at config load).
+
+    Raises:
+        HTTPException: 500 if the cluster's host isn't in user@host form
+    """
+    target = load_clusters_config().ssh_targets.get(cluster_name)
+    if target is None:
+        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
+
+    return target
+
+
+def get_cluster_and_target(cluster_name: str) -> Tuple[Dict[str, Any], SSHTarget]:
+    """
+    Look up a cluster and its SSH connection parameters.
+
+    Raises:
+        HTTPException: See get_cluster_or_404 and get_ssh_target
+    """
+    cluster = get_cluster_or_404(cluster_name)
+    return cluster, get_ssh_target(cluster_name, cluster)
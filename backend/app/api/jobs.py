@@ -1,25 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, load_only, undefer
 from typing import List, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
-import yaml
-import tempfile
+from types import SimpleNamespace
+import asyncio
 import logging
-from pathlib import Path
-
-from app.core.database import get_db
-from app.core.config import settings
-from app.core.ssh_manager import SSHManager
+import orjson
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.database import get_db, SessionLocal
+from app.core.cluster_config import load_clusters_config
+from app.core.ssh_manager import SSHTarget, ssh_pool
+from app.api.dependencies import get_cluster_or_404, get_cluster_and_target
 from app.models.job import Job
 from app.models.project import Project
 from app.services.slurm_generator import SlurmScriptGenerator
 from app.services.job_monitor import JobMonitor
 from app.services.project_config import ProjectConfig
+from app.services.submit_batcher import SubmitBatcher
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Worker threads for SLURM submissions (SSH + sbatch), so bursts of submits
+# neither hold up responses nor exhaust the request threadpool
+submit_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="slurm-submit")
+
+# Rendered SLURM scripts, so re-previewing (and then submitting) the same
+# form skips building the command and rendering the template
+# Format: {(config objects, job/cluster fields): script}, least recently used first
+_script_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_script_cache_lock = threading.Lock()
+SCRIPT_CACHE_MAX_ENTRIES = 256
+
+# Most clusters queried at once by the bulk status refresh
+MAX_PARALLEL_CLUSTER_QUERIES = 8
+
+# Read size for streaming logs over SFTP
+LOG_STREAM_CHUNK_SIZE = 64 * 1024
+
 
 # Pydantic schemas
 class JobCreate(BaseModel):
@@ -39,7 +65,12 @@ class JobCreate(BaseModel):
     config_name: str | None = None  # Hydra --config-name override
 
 
-class JobResponse(BaseModel):
+class JobStatusRefresh(BaseModel):
+    job_ids: List[str]
+
+
+class JobListItem(BaseModel):
+    """Job as returned by list_jobs; omits the generated SLURM script."""
     id: str
     project_id: str
     name: str
@@ -58,18 +89,29 @@ class JobResponse(BaseModel):
     raw_hydra_overrides: str | None
     slurm_job_id: str | None
     slurm_status: str | None
-    slurm_script: str | None
     error_message: str | None
     wandb_run_url: str | None
     runtime_seconds: int | None
     submitted_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobResponse(JobListItem):
+    slurm_script: str | None
+
+
+# Job columns needed to build a JobListItem
+JOB_LIST_COLUMNS = [getattr(Job, field) for field in JobListItem.model_fields]
 
 
 # Helper functions
+
+# https://<domain>/<path>[.git][/]
+_HTTPS_URL_RE = re.compile(r'^https://([^/]+)/(.+?)(?:\.git)?/?$')
+
+
 def convert_https_to_ssh_url(url: str) -> str:
     """
     Convert HTTPS Git URL to SSH URL for non-interactive cloning.
@@ -79,45 +121,59 @@ def convert_https_to_ssh_url(url: str) -> str:
         https://github.com/user/repo -> git@github.com:user/repo.git
         git@github.com:user/repo.git -> git@github.com:user/repo.git (unchanged)
     """
-    if not url:
+    if not url or url.startswith('git@'):
         return url
 
-    # Already SSH format
-    if url.startswith('git@'):
+    match = _HTTPS_URL_RE.match(url)
+    if not match:
         return url
 
-    # Convert HTTPS to SSH
-    if url.startswith('https://'):
-        # Remove https://
-        url = url.replace('https://', '')
-
-        # Split domain and path
-        parts = url.split('/', 1)
-        if len(parts) == 2:
-            domain, path = parts
-
-            # Ensure .git suffix
-            if not path.endswith('.git'):
-                path += '.git'
-
-            # Convert to SSH format
-            return f"git@{domain}:{path}"
-
-    return url
+    domain, path = match.groups()
+    return f"git@{domain}:{path}.git"
 
 
 def generate_slurm_script_for_job(job: Job, project: Project, cluster: dict) -> str:
     """
     Generate SLURM script for a job without submitting it.
 
+    job and project only need to expose the attributes read here, so previews
+    can pass lightweight stand-ins instead of ORM objects.
+
     Returns:
         The generated SLURM script content
     """
     # Load project configuration
-    project_config = ProjectConfig(project.local_path)
+    project_config = ProjectConfig.cached(project.local_path)
 
     # Generate SLURM script
-    generator = SlurmScriptGenerator()
+    generator = SlurmScriptGenerator.cached()
+
+    # Both objects above are replaced when their file changes, so keying on
+    # them (by identity) invalidates cached scripts on config/template edits.
+    # Dict order matters (it's the override order), so keys aren't sorted.
+    key = (
+        project_config,
+        generator,
+        project.repo_url,
+        orjson.dumps(cluster),
+        job.name,
+        job.partition,
+        job.num_nodes,
+        job.gpus_per_node,
+        job.commit_sha,
+        job.gpu_type,
+        job.cpus_per_task,
+        job.memory,
+        job.time_limit,
+        job.config_name,
+        job.raw_hydra_overrides,
+        orjson.dumps(job.hydra_overrides),
+    )
+    with _script_cache_lock:
+        script_content = _script_cache.get(key)
+        if script_content is not None:
+            _script_cache.move_to_end(key)
+            return script_content
 
     # Build python command using project's train script
     python_command = generator.build_python_command(
@@ -155,124 +211,237 @@ def generate_slurm_script_for_job(job: Job, project: Project, cluster: dict) ->
         package_name=project_config.package_name
     )
 
+    with _script_cache_lock:
+        _script_cache[key] = script_content
+        while len(_script_cache) > SCRIPT_CACHE_MAX_ENTRIES:
+            _script_cache.popitem(last=False)
+
     return script_content
 
 
-def submit_slurm_job_sync(job_id: str, db: Session):
+def _fetch_job_status(cluster: dict, target: SSHTarget, slurm_job_id: str):
     """
-    Submit a SLURM job to the cluster.
+    Query SLURM for a job's status over SSH.
 
-    This function:
-    1. Generates SLURM script from template
-    2. Uploads script to cluster
-    3. Executes sbatch
-    4. Updates job record with SLURM job ID
+    Blocking, so endpoints call it through run_in_threadpool.
+
+    Returns:
+        Tuple of (status, reason, runtime_seconds)
     """
-    # Get job from database
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        logger.error(f"Job {job_id} not found")
-        return
+    ssh = ssh_pool.get(*target)
+    use_login = cluster.get('use_login_shell', False)
+    job_monitor = JobMonitor(ssh, use_login_shell=use_login)
+    return job_monitor.get_job_status(slurm_job_id)
 
-    # Get project
-    project = db.query(Project).filter(Project.id == job.project_id).first()
-    if not project:
-        logger.error(f"Project {job.project_id} not found")
-        job.slurm_status = "FAILED"
-        db.commit()
-        return
 
-    # Get cluster config
+def _fetch_job_statuses(cluster: dict, target: SSHTarget, slurm_job_ids: List[str]):
+    """
+    Query SLURM for many jobs' statuses with batched squeue/sacct calls over SSH.
+
+    Blocking, so endpoints call it through run_in_threadpool.
+
+    Returns:
+        Dict of {slurm_job_id: (status, runtime_seconds)}, UNKNOWN for jobs SLURM has no record of
+    """
+    ssh = ssh_pool.get(*target)
+    use_login = cluster.get('use_login_shell', False)
+    job_monitor = JobMonitor(ssh, use_login_shell=use_login)
+    return job_monitor.get_job_statuses(slurm_job_ids)
+
+
+def _fetch_job_logs(cluster: dict, target: SSHTarget, log_path: str, tail_lines: int | None) -> str:
+    """
+    Fetch the end of a job's log over SSH (the full log if tail_lines is None).
+
+    Blocking, so endpoints call it through run_in_threadpool.
+    """
+    ssh = ssh_pool.get(*target)
+    job_monitor = JobMonitor(ssh, use_login_shell=cluster.get('use_login_shell', False))
+    return job_monitor.get_job_logs(log_path, tail_lines=tail_lines)
+
+
+def _find_wandb_url(cluster: dict, target: SSHTarget, log_path: str) -> str | None:
+    """
+    Grep a job's log on the cluster for its WandB URL.
+
+    Blocking, so endpoints call it through run_in_threadpool.
+    """
+    ssh = ssh_pool.get(*target)
+    job_monitor = JobMonitor(ssh, use_login_shell=cluster.get('use_login_shell', False))
+    return job_monitor.find_wandb_url(log_path)
+
+
+def _open_job_log(target: SSHTarget, log_path: str):
+    """
+    Open a job's log for reading over SFTP.
+
+    Blocking, so endpoints call it through run_in_threadpool.
+
+    Returns:
+        Tuple of (sftp, log_file); both are closed by _iter_job_log
+    """
+    sftp = ssh_pool.get(*target).open_sftp()
     try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        logger.error(f"Error reading cluster config: {e}")
-        job.slurm_status = "FAILED"
-        db.commit()
-        return
+        return sftp, sftp.open(log_path, 'rb')
+    except Exception:
+        sftp.close()
+        raise
 
-    if job.cluster not in clusters:
-        logger.error(f"Cluster {job.cluster} not found in config")
-        job.slurm_status = "FAILED"
-        db.commit()
-        return
 
-    cluster = clusters[job.cluster]
+def _iter_job_log(sftp, log_file):
+    """Yield an open remote log in LOG_STREAM_CHUNK_SIZE chunks, then close it."""
+    try:
+        while chunk := log_file.read(LOG_STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        log_file.close()
+        sftp.close()
+
 
-    # Parse host
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        logger.error(f"Invalid host format: {cluster['host']}")
-        job.slurm_status = "FAILED"
-        db.commit()
-        return
+def submit_slurm_jobs_sync(job_ids: List[str]):
+    """
+    Submit a batch of SLURM jobs (all for one cluster) from a worker thread.
 
+    Opens its own database session; the requests that created the jobs
+    have already returned by the time this runs.
+    """
+    db = SessionLocal()
     try:
-        # Generate SLURM script
-        script_content = generate_slurm_script_for_job(job, project, cluster)
+        _submit_slurm_jobs(job_ids, db)
+    finally:
+        db.close()
 
-        # Save script to database
-        job.slurm_script = script_content
-        db.commit()
 
-        logger.info(f"Generated SLURM script for job {job.name}")
+def _submit_slurm_jobs(job_ids: List[str], db: Session):
+    """
+    Submit SLURM jobs to their cluster.
 
-        # Connect to cluster
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
-        )
+    This function:
+    1. Generates each job's SLURM script from template
+    2. Writes the scripts to the cluster and executes sbatch (single SSH command)
+    3. Updates the job records with SLURM job IDs in one commit
+    """
+    # Get jobs from database (logs and scripts are deferred on the model)
+    jobs = db.query(Job).filter(
+        Job.id.in_(job_ids)
+    ).order_by(Job.submitted_at).all()
+    if not jobs:
+        logger.error(f"Jobs {job_ids} not found")
+        return
+
+    # Column values to write back once submission finishes
+    # Format: {job_id: {column: value}}
+    values = {job.id: {} for job in jobs}
 
-        with ssh:
-            # Create directories on cluster
-            ssh.execute_command(f"mkdir -p {cluster['workspace']}/scripts")
-            ssh.execute_command(f"mkdir -p {cluster['workspace']}/logs")
+    def fail_all(message: str):
+        logger.error(message)
+        for job_values in values.values():
+            job_values["slurm_status"] = "FAILED"
+        _write_job_updates(db, values)
+
+    # Batches are per cluster, so any job's cluster is the batch's cluster
+    cluster_name = jobs[0].cluster
+
+    # Get cluster config
+    try:
+        clusters = load_clusters_config()
+    except Exception as e:
+        fail_all(f"Error reading cluster config: {e}")
+        return
 
-            # Write script to temporary file locally
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.sh', delete=False) as f:
-                f.write(script_content)
-                local_script_path = f.name
+    cluster = clusters.by_name.get(cluster_name)
+    if cluster is None:
+        fail_all(f"Cluster {cluster_name} not found in config")
+        return
 
-            # Upload script to cluster
-            remote_script_path = f"{cluster['workspace']}/scripts/{job.name}_{job.id}.sh"
-            ssh.upload_file(local_script_path, remote_script_path)
+    # SSH connection parameters (parsed from host at config load)
+    target = clusters.ssh_targets.get(cluster_name)
+    if target is None:
+        fail_all(f"Invalid host format: {cluster['host']}")
+        return
 
-            # Make script executable
-            ssh.execute_command(f"chmod +x {remote_script_path}")
+    # Get projects (only the columns script generation uses)
+    projects = {
+        row.id: row
+        for row in db.query(Project.id, Project.local_path, Project.repo_url).filter(
+            Project.id.in_({job.project_id for job in jobs})
+        )
+    }
+
+    # Generate SLURM scripts (saved to the database with the result)
+    # Format: [(job, remote_script_path, script_content)]
+    scripts = []
+    for job in jobs:
+        project = projects.get(job.project_id)
+        if project is None:
+            logger.error(f"Project {job.project_id} not found")
+            values[job.id]["slurm_status"] = "FAILED"
+            continue
+
+        try:
+            script_content = generate_slurm_script_for_job(job, project, cluster)
+        except Exception as e:
+            logger.error(f"Error generating script for job {job.name}: {e}")
+            values[job.id]["slurm_status"] = "FAILED"
+            values[job.id]["error_message"] = f"Job submission error: {str(e)}"
+            continue
+
+        values[job.id]["slurm_script"] = script_content
+        remote_script_path = f"{cluster['workspace']}/scripts/{job.name}_{job.id}.sh"
+        scripts.append((job, remote_script_path, script_content))
+        logger.info(f"Generated SLURM script for job {job.name}")
 
-            # Submit job
+    if scripts:
+        try:
+            # Connect to cluster (pooled connection, stays open for the next caller)
+            ssh = ssh_pool.get(*target)
             use_login = cluster.get('use_login_shell', False)
             job_monitor = JobMonitor(ssh, use_login_shell=use_login)
-            slurm_job_id, error = job_monitor.submit_job(remote_script_path)
-
-            # Clean up local temp file
-            Path(local_script_path).unlink()
+            make_dirs = [f"{cluster['workspace']}/scripts", f"{cluster['workspace']}/logs"]
 
+            # Create directories, write the scripts and submit them in one SSH command
+            if len(scripts) == 1:
+                _, path, content = scripts[0]
+                results = [job_monitor.submit_job(path, script_content=content, make_dirs=make_dirs)]
+            else:
+                results = job_monitor.submit_jobs(
+                    [(path, content) for _, path, content in scripts],
+                    make_dirs=make_dirs
+                )
+        except Exception as e:
+            logger.error(f"Error submitting jobs to {cluster_name}: {e}")
+            for job, _, _ in scripts:
+                values[job.id]["slurm_status"] = "FAILED"
+                values[job.id]["error_message"] = f"Job submission error: {str(e)}"
+            results = []
+
+        for (job, _, _), (slurm_job_id, error) in zip(scripts, results):
+            job_values = values[job.id]
             if slurm_job_id:
-                job.slurm_job_id = slurm_job_id
-                job.slurm_status = "PENDING"
-                job.error_message = None  # Clear any previous errors
+                job_values["slurm_job_id"] = slurm_job_id
+                job_values["slurm_status"] = "PENDING"
+                job_values["error_message"] = None  # Clear any previous errors
                 logger.info(f"Job {job.name} submitted successfully with SLURM ID {slurm_job_id}")
             else:
-                job.slurm_status = "FAILED"
-                job.error_message = f"SLURM submission failed: {error}"
+                job_values["slurm_status"] = "FAILED"
+                job_values["error_message"] = f"SLURM submission failed: {error}"
                 logger.error(f"Failed to submit job {job.name}: {error}")
 
-            db.commit()
+    _write_job_updates(db, values)
 
-    except Exception as e:
-        logger.error(f"Error submitting job {job.name}: {e}")
-        job.slurm_status = "FAILED"
-        job.error_message = f"Job submission error: {str(e)}"
-        db.commit()
+
+def _write_job_updates(db: Session, values: Dict[str, Dict[str, Any]]) -> None:
+    """Write per-job column values in one executemany UPDATE and commit."""
+    db.bulk_update_mappings(Job, [{"id": job_id, **job_values} for job_id, job_values in values.items()])
+    db.commit()
+
+
+# Groups submissions arriving close together (e.g. a sweep) per cluster
+submit_batcher = SubmitBatcher(submit_slurm_jobs_sync, submit_executor)
 
 
 @router.post("/preview", response_model=dict)
-async def preview_job(
+def preview_job(
     job_data: JobCreate,
     db: Session = Depends(get_db)
 ):
@@ -282,8 +451,10 @@ async def preview_job(
     Returns:
         Dictionary with 'script' key containing the generated SLURM script
     """
-    # Validate project exists
-    project = db.query(Project).filter(Project.id == job_data.project_id).first()
+    # Validate project exists (only the columns script generation uses)
+    project = db.query(
+        Project.local_path, Project.repo_url, Project.current_commit
+    ).filter(Project.id == job_data.project_id).first()
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -295,36 +466,10 @@ async def preview_job(
         )
 
     # Get cluster config
-    try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
-
-    if job_data.cluster not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{job_data.cluster}' not found")
-
-    cluster = clusters[job_data.cluster]
+    cluster = get_cluster_or_404(job_data.cluster)
 
-    # Create temporary job object (not saved to DB)
-    temp_job = Job(
-        project_id=job_data.project_id,
-        name=job_data.name,
-        description=job_data.description,
-        commit_sha=project.current_commit,
-        cluster=job_data.cluster,
-        partition=job_data.partition,
-        gpu_type=job_data.gpu_type,
-        num_nodes=job_data.num_nodes,
-        gpus_per_node=job_data.gpus_per_node,
-        cpus_per_task=job_data.cpus_per_task,
-        memory=job_data.memory,
-        time_limit=job_data.time_limit,
-        hydra_overrides=job_data.hydra_overrides,
-        raw_hydra_overrides=job_data.raw_hydra_overrides,
-        config_name=job_data.config_name,
-    )
+    # Stand-in for the job (not saved to DB); script generation only reads attributes
+    temp_job = SimpleNamespace(**job_data.model_dump(), commit_sha=project.current_commit)
 
     try:
         # Generate SLURM script
@@ -335,9 +480,8 @@ async def preview_job(
 
 
 @router.post("/", response_model=JobResponse)
-async def submit_job(
+def submit_job(
     job_data: JobCreate,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -352,7 +496,7 @@ async def submit_job(
     6. Start background task to monitor job status
     """
     # Validate project exists
-    project = db.query(Project).filter(Project.id == job_data.project_id).first()
+    project = db.get(Project, job_data.project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -385,25 +529,38 @@ async def submit_job(
 
     db.add(job)
     db.commit()
-    db.refresh(job)
 
-    # Submit job in background
-    background_tasks.add_task(submit_slurm_job_sync, job.id, db)
+    # Submit job in background, detached from this request (batched with
+    # other jobs for the same cluster submitted around the same time)
+    submit_batcher.add(job.cluster, job.id)
 
     return job
 
 
-@router.get("/", response_model=List[JobResponse])
-async def list_jobs(
+@router.get("/", response_model=List[JobListItem])
+def list_jobs(
     project_id: str | None = None,
     include_archived: bool = False,
+    limit: int | None = Query(None, ge=1),
+    offset: int = Query(0, ge=0),
+    before: datetime | None = None,
+    before_id: str | None = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get all jobs, optionally filtered by project.
+    Get all jobs, optionally filtered by project, newest first.
     By default, archived jobs are excluded.
+
+    Use limit/offset to page through large job lists; without a limit all
+    matching jobs are returned. For deep pages, pass the submitted_at and id
+    of the last job seen as before and before_id instead of an offset: it
+    seeks straight to the next page on the (project_id, archived,
+    submitted_at) index rather than skipping offset rows. Jobs submitted in
+    one batch share a submitted_at, the id breaks the tie. Use
+    GET /jobs/{job_id} for the SLURM script.
     """
-    query = db.query(Job)
+    # Only load the columns JobListItem returns (not logs, the script, ...)
+    query = db.query(Job).options(load_only(*JOB_LIST_COLUMNS))
 
     if project_id:
         query = query.filter(Job.project_id == project_id)
@@ -415,114 +572,235 @@ async def list_jobs(
         # When include_archived is False, show ONLY non-archived jobs
         query = query.filter(Job.archived == 0)
 
-    jobs = query.order_by(Job.submitted_at.desc()).all()
-    return jobs
+    if before is not None:
+        if before_id is not None:
+            query = query.filter(or_(
+                Job.submitted_at < before,
+                and_(Job.submitted_at == before, Job.id < before_id)
+            ))
+        else:
+            query = query.filter(Job.submitted_at < before)
+
+    query = query.order_by(Job.submitted_at.desc(), Job.id.desc()).offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query.all()
 
 
 @router.get("/{job_id}", response_model=JobResponse)
-async def get_job(job_id: str, db: Session = Depends(get_db)):
+def get_job(job_id: str, db: Session = Depends(get_db)):
     """Get a specific job."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id, options=[undefer(Job.slurm_script)])
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
 
 
+@router.get("/{job_id}/logs/stream")
+async def stream_job_logs(job_id: str, db: Session = Depends(get_db)):
+    """
+    Stream a job's full, unfiltered log as plain text.
+
+    The log is read over SFTP in chunks and sent as it arrives, so large logs
+    are never held in memory. The WandB URL, if known, is sent in the
+    X-Wandb-URL header.
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not job.slurm_job_id:
+        raise HTTPException(status_code=404, detail="Job not yet submitted to SLURM")
+
+    # Get cluster config and SSH connection parameters
+    cluster, target = get_cluster_and_target(job.cluster)
+
+    log_path = f"{cluster['workspace']}/logs/{job.name}-{job.slurm_job_id}.out"
+
+    # Open before responding so a missing log is still reported as an error
+    try:
+        sftp, log_file = await run_in_threadpool(_open_job_log, target, log_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Log file not found: {log_path}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error opening logs: {str(e)}")
+
+    # StreamingResponse iterates sync generators in the threadpool
+    return StreamingResponse(
+        _iter_job_log(sftp, log_file),
+        media_type="text/plain",
+        headers={"X-Wandb-URL": job.wandb_run_url or ""}
+    )
+
+
 @router.post("/{job_id}/archive")
-async def archive_job(job_id: str, db: Session = Depends(get_db)):
+def archive_job(job_id: str, db: Session = Depends(get_db)):
     """Archive a job (hide from default view)."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     job.archived = 1
     db.commit()
-    db.refresh(job)
     return {"message": "Job archived successfully", "job": job}
 
 
 @router.post("/{job_id}/unarchive")
-async def unarchive_job(job_id: str, db: Session = Depends(get_db)):
+def unarchive_job(job_id: str, db: Session = Depends(get_db)):
     """Unarchive a job (show in default view)."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
     job.archived = 0
     db.commit()
-    db.refresh(job)
     return {"message": "Job unarchived successfully", "job": job}
 
 
-@router.post("/{job_id}/refresh-status")
-async def refresh_job_status(job_id: str, db: Session = Depends(get_db)):
-    """
-    Manually refresh job status from SLURM cluster.
+@router.post("/refresh-status/bulk")
+async def refresh_job_statuses(request: JobStatusRefresh, db: Session = Depends(get_db)):
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    Refresh the status of many jobs at once.
 
-    if not job.slurm_job_id:
-        return {"message": "Job not yet submitted to SLURM", "job": job}
+    Jobs are grouped by cluster and each cluster gets one batched
+    squeue/sacct lookup, all in parallel; the results are written back in one
+    commit. Jobs that couldn't be resolved are listed in errors by job ID.
+    """
+    jobs = db.query(Job.id, Job.cluster, Job.slurm_job_id).filter(
+        Job.id.in_(request.job_ids),
+        Job.slurm_job_id.isnot(None)
+    ).all()
 
-    # Get cluster config
     try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
+        clusters = load_clusters_config()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
 
-    if job.cluster not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{job.cluster}' not found")
+    # {cluster_name: {slurm_job_id: job_id}}
+    by_cluster: Dict[str, Dict[str, str]] = defaultdict(dict)
+    for job_id, cluster_name, slurm_job_id in jobs:
+        by_cluster[cluster_name][slurm_job_id] = job_id
+
+    errors = {}
+    found = {job_id for job_id, _, _ in jobs}
+    for job_id in request.job_ids:
+        if job_id not in found:
+            errors[job_id] = "Job not found or not yet submitted to SLURM"
+
+    queried = []
+    for cluster_name in by_cluster:
+        target = clusters.ssh_targets.get(cluster_name)
+        if target is None:
+            for job_id in by_cluster[cluster_name].values():
+                errors[job_id] = f"Cluster '{cluster_name}' not found or has an invalid host"
+            continue
+        queried.append(cluster_name)
+
+    # Query clusters in parallel, capped so a large batch doesn't take over the
+    # threadpool. SSH is blocking, keep it off the event loop
+    semaphore = asyncio.Semaphore(MAX_PARALLEL_CLUSTER_QUERIES)
+
+    async def query_cluster(name: str):
+        async with semaphore:
+            return await run_in_threadpool(
+                _fetch_job_statuses,
+                clusters.by_name[name],
+                clusters.ssh_targets[name],
+                list(by_cluster[name])
+            )
+
+    results = await asyncio.gather(
+        *(query_cluster(name) for name in queried),
+        return_exceptions=True
+    )
 
-    cluster = clusters[job.cluster]
+    updates = []
+    for cluster_name, result in zip(queried, results):
+        if isinstance(result, Exception):
+            for job_id in by_cluster[cluster_name].values():
+                errors[job_id] = f"Error getting job status: {str(result)}"
+            continue
+
+        for slurm_job_id, (status, runtime_seconds) in result.items():
+            job_id = by_cluster[cluster_name].get(slurm_job_id)
+            if job_id is None:
+                continue
+            if status == "UNKNOWN":
+                errors[job_id] = f"SLURM job {slurm_job_id} not found in squeue or sacct"
+                continue
+            update = {"id": job_id, "slurm_status": status}
+            if runtime_seconds is not None:
+                update["runtime_seconds"] = runtime_seconds
+            updates.append(update)
 
-    # Parse host
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
+    if updates:
+        db.bulk_update_mappings(Job, updates)
+        db.commit()
 
-    # Get job status
-    try:
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
-        )
+    return {
+        "message": f"Updated {len(updates)} of {len(request.job_ids)} jobs",
+        "statuses": {
+            u["id"]: {"slurm_status": u["slurm_status"], "runtime_seconds": u.get("runtime_seconds")}
+            for u in updates
+        },
+        "errors": errors
+    }
 
-        with ssh:
-            use_login = cluster.get('use_login_shell', False)
-            job_monitor = JobMonitor(ssh, use_login_shell=use_login)
-            status, reason, runtime_seconds = job_monitor.get_job_status(job.slurm_job_id)
 
-            job.slurm_status = status
-            if runtime_seconds is not None:
-                job.runtime_seconds = runtime_seconds
-            db.commit()
-            db.refresh(job)
+@router.post("/{job_id}/refresh-status")
+async def refresh_job_status(job_id: str, db: Session = Depends(get_db)):
+    """
+    Manually refresh job status from SLURM cluster.
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not job.slurm_job_id:
+        return {"message": "Job not yet submitted to SLURM", "job": job}
 
-            return {
-                "message": "Status updated",
-                "job": job,
-                "reason": reason
-            }
+    # Get cluster config and SSH connection parameters
+    cluster, target = get_cluster_and_target(job.cluster)
 
+    # Get job status (SSH is blocking, keep it off the event loop)
+    try:
+        status, reason, runtime_seconds = await run_in_threadpool(
+            _fetch_job_status, cluster, target, job.slurm_job_id
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error getting job status: {str(e)}"
         )
 
+    job.slurm_status = status
+    if runtime_seconds is not None:
+        job.runtime_seconds = runtime_seconds
+    db.commit()
+
+    return {
+        "message": "Status updated",
+        "job": job,
+        "reason": reason
+    }
+
 
 @router.get("/{job_id}/logs")
-async def get_job_logs(job_id: str, db: Session = Depends(get_db)):
+async def get_job_logs(
+    job_id: str,
+    tail_lines: int = Query(500, ge=0),
+    db: Session = Depends(get_db)
+):
     """
-    Fetch job logs from cluster and extract WandB URL.
+    Fetch the last tail_lines lines of a job's log and its WandB URL.
+
+    Returns the last 500 lines by default; pass tail_lines=0 for the whole
+    log. Progress bar redraws are filtered out either way. The WandB URL is
+    found by grepping the log on the cluster, so the full log never has to
+    be transferred.
     """
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = db.get(Job, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -532,58 +810,34 @@ async def get_job_logs(job_id: str, db: Session = Depends(get_db)):
             "wandb_url": None
         }
 
-    # Get cluster config
-    try:
-        with open(settings.clusters_config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            clusters = {c['name']: c for c in config.get('clusters', [])}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error reading cluster config: {str(e)}")
-
-    if job.cluster not in clusters:
-        raise HTTPException(status_code=404, detail=f"Cluster '{job.cluster}' not found")
+    # Get cluster config and SSH connection parameters
+    cluster, target = get_cluster_and_target(job.cluster)
 
-    cluster = clusters[job.cluster]
+    # Construct log file path
+    log_path = f"{cluster['workspace']}/logs/{job.name}-{job.slurm_job_id}.out"
 
-    # Parse host
-    if '@' in cluster['host']:
-        username, hostname = cluster['host'].split('@')
-    else:
-        raise HTTPException(status_code=500, detail=f"Invalid host format: {cluster['host']}")
+    # Fetch logs and look for the WandB URL (if not known yet) in parallel.
+    # SSH is blocking, keep it off the event loop
+    fetches = [run_in_threadpool(_fetch_job_logs, cluster, target, log_path, tail_lines or None)]
+    if not job.wandb_run_url:
+        fetches.append(run_in_threadpool(_find_wandb_url, cluster, target, log_path))
 
-    # Fetch logs
     try:
-        ssh = SSHManager(
-            host=hostname,
-            username=username,
-            key_path=cluster['ssh_key_path']
-        )
-
-        with ssh:
-            use_login = cluster.get('use_login_shell', False)
-            job_monitor = JobMonitor(ssh, use_login_shell=use_login)
-
-            # Construct log file path
-            log_path = f"{cluster['workspace']}/logs/{job.name}-{job.slurm_job_id}.out"
-
-            # Fetch entire log file (not just tail)
-            logs = job_monitor.get_job_logs(log_path, tail_lines=None)
-
-            # Extract WandB URL if exists
-            wandb_url = job_monitor.extract_wandb_url(logs)
-
-            # Update job if WandB URL found
-            if wandb_url and not job.wandb_run_url:
-                job.wandb_run_url = wandb_url
-                db.commit()
-
-            return {
-                "logs": logs,
-                "wandb_url": wandb_url or job.wandb_run_url
-            }
-
+        logs, *found = await asyncio.gather(*fetches)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error fetching logs: {str(e)}"
         )
+
+    wandb_url = found[0] if found else None
+
+    # Update job if WandB URL found
+    if wandb_url:
+        job.wandb_run_url = wandb_url
+        db.commit()
+
+    return {
+        "logs": logs,
+        "wandb_url": wandb_url or job.wandb_run_url
+    }
@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import threading
+import orjson
+from collections import OrderedDict
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only
 from typing import List
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 
 from app.core.database import get_db
 from app.models.project import Project
 from app.models.job import Job
 from app.services.git_service import GitService
+from app.services.hydra_parser import HydraParser
+from app.services.project_config import ProjectConfig
 
 router = APIRouter()
 
+# Encoded hydra-config responses, keyed by (local_path, config_name, conf dir
+# fingerprint), so hits skip parsing and JSON encoding alike.
+# Stale entries just age out, a changed file gives a new fingerprint.
+_hydra_config_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_hydra_config_cache_lock = threading.Lock()
+HYDRA_CONFIG_CACHE_MAX_ENTRIES = 64
+
 
 # Pydantic schemas
 class ProjectCreate(BaseModel):
@@ -27,12 +41,11 @@ class ProjectResponse(BaseModel):
     added_at: datetime
     last_synced: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 @router.post("/", response_model=ProjectResponse)
-async def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
+def create_project(project_data: ProjectCreate, db: Session = Depends(get_db)):
     """
     Add a new project by analyzing a local Git repository.
 
@@ -41,18 +54,11 @@ async def create_project(project_data: ProjectCreate, db: Session = Depends(get_
     2. Extracts repo metadata (name, remote URL, branch, commit)
     3. Stores project in database
     """
-    git_service = GitService(project_data.local_path)
-
     try:
-        metadata = git_service.get_repo_metadata()
+        metadata = GitService.cached_metadata(project_data.local_path)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid Git repository: {str(e)}")
 
-    # Check if project already exists
-    existing = db.query(Project).filter(Project.name == metadata["name"]).first()
-    if existing:
-        raise HTTPException(status_code=400, detail=f"Project '{metadata['name']}' already exists")
-
     # Create new project
     project = Project(
         name=metadata["name"],
@@ -63,80 +69,112 @@ async def create_project(project_data: ProjectCreate, db: Session = Depends(get_
     )
 
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Project names are unique
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Project '{metadata['name']}' already exists")
 
     return project
 
 
 @router.get("/", response_model=List[ProjectResponse])
-async def list_projects(db: Session = Depends(get_db)):
+def list_projects(db: Session = Depends(get_db)):
     """Get all projects."""
     projects = db.query(Project).all()
     return projects
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str, db: Session = Depends(get_db)):
+def get_project(project_id: str, db: Session = Depends(get_db)):
     """Get a specific project."""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
 
 
 @router.post("/{project_id}/sync")
-async def sync_project(project_id: str, db: Session = Depends(get_db)):
+def sync_project(project_id: str, db: Session = Depends(get_db)):
     """
     Sync project metadata with local Git repository.
     Updates repo URL, branch, and commit SHA.
     """
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    git_service = GitService(project.local_path)
-    metadata = git_service.get_repo_metadata()
+    metadata = GitService.cached_metadata(project.local_path)
 
     project.repo_url = metadata["repo_url"]
     project.current_branch = metadata["branch"]
     project.current_commit = metadata["commit_sha"]
 
     db.commit()
-    db.refresh(project)
 
     return project
 
 
 @router.get("/{project_id}/hydra-config")
-async def get_hydra_config(project_id: str, config_name: str = None, db: Session = Depends(get_db)):
+def get_hydra_config(
+    project_id: str,
+    request: Request,
+    config_name: str = None,
+    db: Session = Depends(get_db)
+):
     """
     Parse Hydra configuration from project's conf/ or configs/ directory.
     Returns a JSON structure for dynamic UI form generation.
 
+    The response carries an ETag derived from the config files' mtimes and
+    sizes; send it back in If-None-Match to get a 304 while nothing changed.
+    Walks and parses files, so it's a plain def and runs in the threadpool.
+
     Args:
         project_id: ID of the project
         config_name: Optional name of the config file (e.g., "config_qwen2.5_1.5b").
                     If not provided, defaults to "config.yaml"
     """
-    from app.services.hydra_parser import HydraParser
-
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     try:
         parser = HydraParser(project.local_path)
+        etag = f'"{parser.fingerprint(config_name)}"'
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        cache_key = (project.local_path, config_name, etag)
+        with _hydra_config_cache_lock:
+            content = _hydra_config_cache.get(cache_key)
+            if content is not None:
+                _hydra_config_cache.move_to_end(cache_key)
+                return Response(content=content, media_type="application/json", headers={"ETag": etag})
+
         config_data = parser.parse_config_groups(config_name)
         ui_schema = parser.build_ui_schema(config_name)
 
-        return {
+        result = {
             "success": True,
             "config_groups": config_data["config_groups"],
             "main_config": config_data["main_config"],
             "available_configs": config_data["available_configs"],
             "ui_schema": ui_schema
         }
+
+        # jsonable_encoder like a returned dict would get (YAML may have non-str keys)
+        content = orjson.dumps(jsonable_encoder(result))
+
+        with _hydra_config_cache_lock:
+            _hydra_config_cache[cache_key] = content
+            if len(_hydra_config_cache) > HYDRA_CONFIG_CACHE_MAX_ENTRIES:
+                _hydra_config_cache.popitem(last=False)
+
+        return Response(content=content, media_type="application/json", headers={"ETag": etag})
     except ValueError as e:
         # No Hydra config directory found
         return {
@@ -152,17 +190,15 @@ async def get_hydra_config(project_id: str, config_name: str = None, db: Session
 
 
 @router.get("/{project_id}/config")
-async def get_project_config(project_id: str, db: Session = Depends(get_db)):
+def get_project_config(project_id: str, db: Session = Depends(get_db)):
     """
     Get project-specific configuration from .mlops-config.yaml
     """
-    from app.services.project_config import ProjectConfig
-
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
-    config = ProjectConfig(project.local_path)
+    config = ProjectConfig.cached(project.local_path)
 
     return {
         "exists": config.exists(),
@@ -176,18 +212,23 @@ async def get_project_config(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("/{project_id}/last-job-config")
-async def get_last_job_config(project_id: str, db: Session = Depends(get_db)):
+def get_last_job_config(project_id: str, db: Session = Depends(get_db)):
     """
     Get the configuration from the most recently submitted job for this project.
     Used to pre-populate the launch form with previous run settings.
     """
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
     # Get most recent job for this project
     last_job = (
         db.query(Job)
+        .options(load_only(
+            Job.description, Job.cluster, Job.partition, Job.num_nodes,
+            Job.gpus_per_node, Job.gpu_type, Job.cpus_per_task, Job.memory,
+            Job.time_limit, Job.config_name, Job.hydra_overrides, Job.raw_hydra_overrides
+        ))
         .filter(Job.project_id == project_id)
         .order_by(Job.submitted_at.desc())
         .first()
@@ -220,12 +261,15 @@ async def get_last_job_config(project_id: str, db: Session = Depends(get_db)):
 
 
 @router.delete("/{project_id}")
-async def delete_project(project_id: str, db: Session = Depends(get_db)):
+def delete_project(project_id: str, db: Session = Depends(get_db)):
     """Delete a project."""
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = db.get(Project, project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    # Delete the jobs in one statement; the ORM cascade would load every job
+    # and delete them one row at a time
+    db.query(Job).filter(Job.project_id == project_id).delete(synchronize_session=False)
     db.delete(project)
     db.commit()
 
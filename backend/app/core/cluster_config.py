@@ -0,0 +1,151 @@
+import os
+import yaml
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, FrozenSet, Optional, Tuple
+
+from app.core.config import settings
+from app.core.ssh_manager import SSHTarget
+
+logger = logging.getLogger(__name__)
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+class ClustersConfig:
+    """Parsed clusters.yaml with per-cluster lookups built once at load time."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Build lookup tables from a parsed clusters.yaml.
+
+        Args:
+            config: Parsed YAML contents
+        """
+        self.config = config
+        self.clusters: List[Dict[str, Any]] = config.get('clusters', [])
+
+        # {cluster_name: cluster}
+        self.by_name: Dict[str, Dict[str, Any]] = {c['name']: c for c in self.clusters}
+
+        # {cluster_name: SSHTarget}, only for hosts in user@host form
+        self.ssh_targets: Dict[str, SSHTarget] = {}
+        # {cluster_name: frozenset of GPU types}, only for clusters that restrict them
+        self.allowed_gpu_types: Dict[str, FrozenSet[str]] = {}
+
+        for name, cluster in self.by_name.items():
+            host = cluster.get('host', '')
+            if host.count('@') == 1:
+                username, hostname = host.split('@')
+                key_path = str(Path(cluster.get('ssh_key_path', '')).expanduser())
+                self.ssh_targets[name] = SSHTarget(hostname, username, key_path)
+            else:
+                # Reported once per config version; SSH endpoints answer 500 for it
+                logger.warning(f"Cluster '{name}' has invalid host '{host}', expected user@host")
+
+            if cluster.get('allowed_gpu_types'):
+                self.allowed_gpu_types[name] = frozenset(cluster['allowed_gpu_types'])
+
+
+# Parsed clusters.yaml, keyed by (path, mtime_ns, size) of the file it came from.
+# Format: ((path, mtime_ns, size), ClustersConfig)
+_config_cache: Optional[Tuple[Tuple[str, int, int], ClustersConfig]] = None
+
+# Serializes re-parses; loads happen from request handlers, threadpool and poller threads
+_load_lock = threading.Lock()
+
+# True while watch_clusters_config() is running; the cache is then trusted without a stat()
+_watching = False
+
+
+def load_clusters_config(path: Path | None = None) -> ClustersConfig:
+    """
+    Load cluster configuration from clusters.yaml.
+
+    The parsed file is cached and only re-read when its mtime or size
+    changes, so repeated calls cost a single stat(). While the background
+    watcher is running, cached calls skip the stat() as well.
+
+    Args:
+        path: Path to clusters.yaml. If None, uses default from settings.
+
+    Returns:
+        ClustersConfig for the file. Shared between callers, do not mutate.
+
+    Raises:
+        FileNotFoundError: If the config file does not exist
+    """
+    path = str(path or settings.clusters_config_path)
+
+    cached = _config_cache
+    if _watching and cached is not None and cached[0][0] == path:
+        return cached[1]
+
+    return _load(path)
+
+
+def _load(path: str) -> ClustersConfig:
+    """Stat clusters.yaml and re-parse it if it changed since the cached copy."""
+    global _config_cache
+
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+
+    cached = _config_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with _load_lock:
+        # Another thread may have parsed the same version while we waited
+        if _config_cache is not None and _config_cache[0] == key:
+            return _config_cache[1]
+
+        with open(path, 'r') as f:
+            config = ClustersConfig(yaml.load(f, Loader=SafeLoader) or {})
+
+        _config_cache = (key, config)
+        return config
+
+
+async def watch_clusters_config() -> None:
+    """
+    Reload clusters.yaml whenever it changes on disk.
+
+    Meant to run as a background task for the lifetime of the app. Watches the
+    parent directory so editors that save via rename are picked up too.
+    Handlers then always hit the cache; the re-parse runs on a worker thread. If
+    watchfiles is not installed, returns immediately and load_clusters_config()
+    keeps checking mtime on every call.
+    """
+    global _watching, _config_cache
+
+    try:
+        from watchfiles import awatch
+    except ImportError:
+        logger.info("watchfiles not installed, clusters.yaml will be checked on every load")
+        return
+
+    path = Path(settings.clusters_config_path)
+    _watching = True
+    try:
+        async for changes in awatch(path.parent):
+            if not any(Path(changed).name == path.name for _, changed in changes):
+                continue
+            try:
+                # Parse off the event loop so a reload doesn't stall in-flight requests
+                await asyncio.to_thread(_load, str(path))
+                logger.info(f"Reloaded cluster config from {path}")
+            except Exception as e:
+                # Drop the cache so callers re-read (and see the error) themselves
+                logger.error(f"Error reloading cluster config: {e}")
+                _config_cache = None
+    except Exception as e:
+        logger.error(f"Stopped watching {path}: {e}")
+    finally:
+        _watching = False
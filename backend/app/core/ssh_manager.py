@@ -1,14 +1,41 @@
 import paramiko
+import threading
+import time
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Dict, NamedTuple, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class SSHTarget(NamedTuple):
+    """Connection parameters for a cluster login node."""
+
+    host: str
+    username: str
+    key_path: str
+
+
+class _SessionSFTPClient(paramiko.SFTPClient):
+    """SFTP client that frees its SSHManager channel slot when closed."""
+
+    _release_session = None
+
+    def close(self) -> None:
+        super().close()
+        # close() may be called more than once, release only the first time
+        release, self._release_session = self._release_session, None
+        if release is not None:
+            release()
+
+
 class SSHManager:
     """Manages SSH connections to remote SLURM clusters."""
 
+    # Commands run concurrently on one connection, each on its own channel.
+    # sshd refuses channels beyond MaxSessions (default 10), so stay below it.
+    MAX_SESSIONS = 8
+
     def __init__(self, host: str, username: str, key_path: str):
         """
         Initialize SSH manager.
@@ -22,6 +49,8 @@ class SSHManager:
         self.username = username
         self.key_path = Path(key_path).expanduser()
         self.client: Optional[paramiko.SSHClient] = None
+        # Limits concurrent command and SFTP channels, see MAX_SESSIONS
+        self._sessions = threading.BoundedSemaphore(self.MAX_SESSIONS)
 
     def connect(self) -> None:
         """Establish SSH connection."""
@@ -40,7 +69,13 @@ class SSHManager:
             logger.error(f"Failed to connect to {self.host}: {e}")
             raise
 
-    def execute_command(self, command: str, use_login_shell: bool = False, timeout: int = 60) -> Tuple[str, str, int]:
+    def execute_command(
+        self,
+        command: str,
+        use_login_shell: bool = False,
+        timeout: int = 60,
+        stdin_data: str | None = None
+    ) -> Tuple[str, str, int]:
         """
         Execute command on remote host.
 
@@ -48,6 +83,7 @@ class SSHManager:
             command: Shell command to execute
             use_login_shell: If True, wrap command in 'bash -lc' to load full environment
             timeout: Command timeout in seconds (default: 60)
+            stdin_data: Optional data written to the command's stdin (then closed)
 
         Returns:
             Tuple of (stdout, stderr, exit_code)
@@ -62,28 +98,59 @@ class SSHManager:
             command = f"bash -lc '{escaped_command}'"
 
         logger.debug(f"Executing: {command}")
-        stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
+        # Queue for a free session rather than have sshd reject the channel
+        with self._sessions:
+            stdin, stdout, stderr = self.client.exec_command(command, timeout=timeout)
 
-        # Set channel timeout for reading output
-        stdout.channel.settimeout(timeout)
-        stderr.channel.settimeout(timeout)
+            if stdin_data is not None:
+                stdin.write(stdin_data)
+                stdin.channel.shutdown_write()
 
-        try:
-            exit_code = stdout.channel.recv_exit_status()
-            stdout_str = stdout.read().decode('utf-8', errors='replace')
-            stderr_str = stderr.read().decode('utf-8', errors='replace')
-        except Exception as e:
-            logger.error(f"Command execution timeout or error: {e}")
-            raise TimeoutError(f"Command execution exceeded {timeout}s timeout")
+            # Set channel timeout for reading output
+            stdout.channel.settimeout(timeout)
+            stderr.channel.settimeout(timeout)
+
+            try:
+                exit_code = stdout.channel.recv_exit_status()
+                stdout_str = stdout.read().decode('utf-8', errors='replace')
+                stderr_str = stderr.read().decode('utf-8', errors='replace')
+            except Exception as e:
+                logger.error(f"Command execution timeout or error: {e}")
+                raise TimeoutError(f"Command execution exceeded {timeout}s timeout")
+
+            return stdout_str, stderr_str, exit_code
 
-        return stdout_str, stderr_str, exit_code
+    def is_active(self) -> bool:
+        """Check whether the underlying SSH transport is still usable."""
+        if not self.client:
+            return False
+        transport = self.client.get_transport()
+        return transport is not None and transport.is_active()
+
+    def open_sftp(self) -> paramiko.SFTPClient:
+        """
+        Open an SFTP session on this connection. Caller must close it.
+
+        The session holds one of the MAX_SESSIONS channel slots until closed.
+        """
+        if not self.client:
+            self.connect()
+
+        self._sessions.acquire()
+        try:
+            sftp = _SessionSFTPClient.from_transport(self.client.get_transport())
+        except Exception:
+            self._sessions.release()
+            raise
+        sftp._release_session = self._sessions.release
+        return sftp
 
     def upload_file(self, local_path: str, remote_path: str) -> None:
         """Upload file to remote host via SFTP."""
         if not self.client:
             self.connect()
 
-        sftp = self.client.open_sftp()
+        sftp = self.open_sftp()
         try:
             sftp.put(local_path, remote_path)
             logger.info(f"Uploaded {local_path} to {remote_path}")
@@ -95,7 +162,7 @@ class SSHManager:
         if not self.client:
             self.connect()
 
-        sftp = self.client.open_sftp()
+        sftp = self.open_sftp()
         try:
             sftp.get(remote_path, local_path)
             logger.info(f"Downloaded {remote_path} to {local_path}")
@@ -116,3 +183,120 @@ class SSHManager:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
+
+
+class SSHConnectionPool:
+    """
+    Keeps one open SSH connection per (username, host, key) and reuses it.
+
+    Opening a connection costs a TCP handshake, key exchange and auth, which
+    dominates the runtime of the short commands we send. Pooled connections
+    are shared between threads; paramiko opens a new channel per command.
+    """
+
+    KEEPALIVE_INTERVAL = 30  # seconds
+    MAX_IDLE = 300  # seconds, close_idle() drops connections unused for longer
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        # Keyed by (username, host, key_path)
+        self._connections: Dict[Tuple[str, str, str], SSHManager] = {}
+        self._locks: Dict[Tuple[str, str, str], threading.Lock] = {}
+        # time.monotonic() of the last get() per connection
+        self._last_used: Dict[Tuple[str, str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str, username: str, key_path: str) -> SSHManager:
+        """
+        Get a connected SSHManager, opening a new connection if needed.
+
+        Do not use the returned manager as a context manager or close it,
+        it stays in the pool for the next caller.
+        """
+        key = (username, host, key_path)
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+            self._last_used[key] = time.monotonic()
+
+        # Per-connection lock so a slow connect doesn't block other clusters
+        with key_lock:
+            ssh = self._connections.get(key)
+            if ssh is not None and ssh.is_active():
+                return ssh
+
+            if ssh is not None:
+                logger.info(f"Pooled connection to {host} is no longer active, reconnecting")
+                ssh.close()
+
+            ssh = SSHManager(host=host, username=username, key_path=key_path)
+            ssh.connect()
+            ssh.client.get_transport().set_keepalive(self.KEEPALIVE_INTERVAL)
+            self._connections[key] = ssh
+            return ssh
+
+    def discard(self, ssh: SSHManager) -> None:
+        """Close a pooled connection and drop it from the pool."""
+        with self._lock:
+            for key, pooled in list(self._connections.items()):
+                if pooled is ssh:
+                    del self._connections[key]
+                    self._last_used.pop(key, None)
+        ssh.close()
+
+    def execute_command(
+        self,
+        host: str,
+        username: str,
+        key_path: str,
+        command: str,
+        use_login_shell: bool = False,
+        timeout: int = 60
+    ) -> Tuple[str, str, int]:
+        """
+        Execute a command over a pooled connection.
+
+        If the pooled connection turns out to be dead, it is discarded and
+        the command is retried once on a fresh connection.
+
+        Returns:
+            Tuple of (stdout, stderr, exit_code)
+        """
+        ssh = self.get(host, username, key_path)
+        try:
+            return ssh.execute_command(command, use_login_shell=use_login_shell, timeout=timeout)
+        except (paramiko.SSHException, EOFError, ConnectionError) as e:
+            logger.warning(f"SSH command on {host} failed ({e}), retrying on a new connection")
+            self.discard(ssh)
+            ssh = self.get(host, username, key_path)
+            return ssh.execute_command(command, use_login_shell=use_login_shell, timeout=timeout)
+
+    def close_idle(self, max_idle: float | None = None) -> None:
+        """Close pooled connections that haven't been used for max_idle seconds."""
+        max_idle = self.MAX_IDLE if max_idle is None else max_idle
+        now = time.monotonic()
+
+        with self._lock:
+            idle_keys = [
+                key for key in self._connections
+                if now - self._last_used.get(key, now) > max_idle
+            ]
+            idle = [self._connections.pop(key) for key in idle_keys]
+            for key in idle_keys:
+                self._last_used.pop(key, None)
+
+        for ssh in idle:
+            logger.info(f"Closing idle SSH connection to {ssh.host}")
+            ssh.close()
+
+    def close_all(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+
+        for ssh in connections:
+            ssh.close()
+
+
+# Global connection pool instance
+ssh_pool = SSHConnectionPool()
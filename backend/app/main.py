@@ -1,10 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from app.core.config import settings
+from app.core.cluster_config import load_clusters_config, watch_clusters_config
 from app.core.database import init_db
+from app.core.ssh_manager import ssh_pool
 from app.api import projects, jobs, clusters
 from app.services.job_poller import poll_job_statuses
 
@@ -20,7 +24,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
-    description="Centralized dashboard for ML experiment submission and monitoring"
+    description="Centralized dashboard for ML experiment submission and monitoring",
+    default_response_class=ORJSONResponse
 )
 
 # Create background scheduler for job polling
@@ -33,6 +38,17 @@ scheduler.add_job(
     name='Poll SLURM job statuses',
     replace_existing=True
 )
+scheduler.add_job(
+    ssh_pool.close_idle,
+    'interval',
+    seconds=60,
+    id='ssh_pool_reaper',
+    name='Close idle pooled SSH connections',
+    replace_existing=True
+)
+
+# Background task reloading clusters.yaml on change, started on startup
+config_watcher: asyncio.Task | None = None
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -54,6 +70,15 @@ async def startup_event():
     init_db()
     logger.info("Database initialized")
 
+    # Parse cluster config up front and keep it fresh in the background
+    global config_watcher
+    try:
+        load_clusters_config()
+        logger.info("Cluster config loaded")
+    except Exception as e:
+        logger.warning(f"Could not load cluster config: {e}")
+    config_watcher = asyncio.create_task(watch_clusters_config())
+
     # Start background job poller
     scheduler.start()
     logger.info(f"Job status poller started (polling every {settings.job_poll_interval}s)")
@@ -63,8 +88,14 @@ async def startup_event():
 async def shutdown_event():
     """Clean up on shutdown."""
     logger.info("Shutting down...")
+    if config_watcher:
+        config_watcher.cancel()
     scheduler.shutdown()
     logger.info("Background scheduler stopped")
+    jobs.submit_batcher.flush_pending()
+    jobs.submit_executor.shutdown(wait=False)
+    ssh_pool.close_all()
+    logger.info("SSH connections closed")
 
 
 @app.get("/")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text, Index
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 import uuid
 
@@ -10,6 +10,14 @@ class Job(Base):
     """SQLAlchemy model for SLURM jobs."""
 
     __tablename__ = "jobs"
+    __table_args__ = (
+        # list_jobs / last-job-config: filter by project, newest first
+        Index("ix_jobs_project_submitted", "project_id", "submitted_at"),
+        # list_jobs default view: project + archived flag, newest first
+        Index("ix_jobs_project_archived_submitted", "project_id", "archived", "submitted_at"),
+        # Job poller: active jobs across all projects, by status
+        Index("ix_jobs_slurm_status", "slurm_status"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("projects.id"), nullable=False)
@@ -37,15 +45,16 @@ class Job(Base):
     # SLURM job info
     slurm_job_id = Column(String, nullable=True)
     slurm_status = Column(String, nullable=True)  # PENDING, RUNNING, COMPLETED, FAILED
-    slurm_script = Column(Text, nullable=True)  # Store the generated SLURM script
+    # Store the generated SLURM script (deferred: only GET /jobs/{id} needs it)
+    slurm_script = deferred(Column(Text, nullable=True))
     error_message = Column(Text, nullable=True)  # Capture submission/execution errors
     runtime_seconds = Column(Integer, nullable=True)  # Job runtime in seconds
 
     # WandB integration
     wandb_run_url = Column(String, nullable=True)
 
-    # Logs (optional: can store tail or path)
-    logs = Column(Text, nullable=True)
+    # Logs (optional: can store tail or path, deferred like slurm_script)
+    logs = deferred(Column(Text, nullable=True))
 
     # Timestamps
     submitted_at = Column(DateTime, default=datetime.utcnow)
@@ -1,6 +1,49 @@
 from git import Repo, InvalidGitRepositoryError
 from pathlib import Path
-from typing import Dict
+import os
+from typing import Dict, Optional, Tuple
+
+
+# Repo metadata per repo path.
+# Format: {repo_path: (state of HEAD/refs/config from _git_state(), metadata)}
+_metadata_cache: Dict[str, Tuple[tuple, Dict[str, str]]] = {}
+
+
+def _git_state(repo_path: str) -> Optional[tuple]:
+    """
+    Cheap snapshot of what get_repo_metadata() reads: the contents of HEAD and
+    the current branch ref (tiny files, and a new commit keeps the ref's size),
+    plus the mtime and size of packed-refs and .git/config.
+
+    Returns:
+        Snapshot tuple, or None if .git isn't a plain directory (worktree,
+        submodule) or HEAD can't be read
+    """
+    git_dir = os.path.join(os.path.expanduser(repo_path), ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), 'r') as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    ref = None
+    if head.startswith("ref: "):
+        try:
+            with open(os.path.join(git_dir, head[len("ref: "):]), 'r') as f:
+                ref = f.read().strip()
+        except OSError:
+            # Packed (or unborn) branch, covered by packed-refs below
+            pass
+
+    state = [head, ref]
+    for name in ("packed-refs", "config"):
+        try:
+            st = os.stat(os.path.join(git_dir, name))
+            state.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            state.append(None)
+
+    return tuple(state)
 
 
 class GitService:
@@ -18,10 +61,37 @@ class GitService:
         """
         self.repo_path = Path(repo_path).expanduser().resolve()
         try:
-            self.repo = Repo(self.repo_path)
+            # Path is already expanded and resolved, and must be the repo root
+            self.repo = Repo(self.repo_path, search_parent_directories=False, expand_vars=False)
         except InvalidGitRepositoryError:
             raise ValueError(f"Not a valid Git repository: {repo_path}")
 
+    @classmethod
+    def cached_metadata(cls, repo_path: str) -> Dict[str, str]:
+        """
+        Get get_repo_metadata() for a repo, only opening it with GitPython
+        if HEAD, the current branch ref or .git/config changed since last time.
+
+        Args:
+            repo_path: Path to local Git repository
+
+        Returns:
+            Repo metadata, see get_repo_metadata(). Shared between callers, do not mutate.
+
+        Raises:
+            ValueError: If path is not a valid Git repo
+        """
+        state = _git_state(repo_path)
+
+        cached = _metadata_cache.get(repo_path)
+        if state is not None and cached is not None and cached[0] == state:
+            return cached[1]
+
+        metadata = cls(repo_path).get_repo_metadata()
+        if state is not None:
+            _metadata_cache[repo_path] = (state, metadata)
+        return metadata
+
     def get_repo_metadata(self) -> Dict[str, str]:
         """
         Extract repository metadata.
@@ -42,15 +112,15 @@ class GitService:
         except AttributeError:
             repo_url = None
 
-        # Get current branch
-        try:
-            branch = self.repo.active_branch.name
-        except TypeError:
-            # Detached HEAD state
+        # Get current branch (HEAD's symbolic ref, no lookup of the branch itself)
+        head = self.repo.head
+        if head.is_detached:
             branch = "detached"
+        else:
+            branch = head.reference.name
 
         # Get current commit SHA
-        commit_sha = self.repo.head.commit.hexsha
+        commit_sha = head.commit.hexsha
 
         return {
             "name": name,
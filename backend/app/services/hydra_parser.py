@@ -1,7 +1,46 @@
+import os
+import hashlib
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+# Parsed YAML files, so unchanged files aren't re-read on every request.
+# Format: {path: ((mtime_ns, size), parsed contents)}
+_yaml_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+def _load_yaml(path: str | Path) -> Any:
+    """
+    Parse a YAML file, re-reading it only if its mtime or size changed.
+
+    Returns:
+        Parsed contents ({} for an empty file). Shared between callers, do not mutate.
+    """
+    key = str(path)
+    st = os.stat(key)
+    version = (st.st_mtime_ns, st.st_size)
+
+    cached = _yaml_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(key, 'r') as f:
+        content = yaml.load(f, Loader=SafeLoader) or {}
+
+    _yaml_cache[key] = (version, content)
+    return content
+
+
+# Special Hydra keys that are never shown as UI parameters
+UI_SKIP_KEYS = frozenset({"defaults", "hydra", "logger"})
+
 
 class HydraParser:
     """Service for parsing Hydra configuration files."""
@@ -23,6 +62,10 @@ class HydraParser:
         else:
             raise ValueError(f"Hydra config directory not found (tried 'conf' and 'configs'): {self.project_path}")
 
+        # parse_config_groups() results for this parser, so build_ui_schema()
+        # doesn't walk the tree again. Format: {(config_name, include_configs): result}
+        self._parsed: Dict[Tuple[str, bool], Dict[str, Any]] = {}
+
     def get_available_configs(self) -> List[str]:
         """
         Get list of available main config files (config.yaml, config_*.yaml).
@@ -33,25 +76,62 @@ class HydraParser:
         config_files = []
 
         # Find all config*.yaml files in the conf directory (not subdirectories)
-        for config_file in self.conf_dir.glob("config*.yaml"):
-            if config_file.is_file():
+        with os.scandir(self.conf_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("config") and entry.name.endswith(".yaml")):
+                    continue
                 # Extract name without extension
-                name = config_file.stem
+                name = entry.name[:-len(".yaml")]
                 # Only include if it's "config" or starts with "config_"
-                if name == "config" or name.startswith("config_"):
+                if (name == "config" or name.startswith("config_")) and entry.is_file():
                     config_files.append(name)
 
         # Sort with "config" first, then alphabetically
         config_files.sort(key=lambda x: (x != "config", x))
         return config_files
 
-    def parse_config_groups(self, config_name: str = None) -> Dict[str, Any]:
+    def fingerprint(self, config_name: str = None) -> str:
+        """
+        Cheap fingerprint of the config directory, without parsing any YAML.
+
+        Hashes the path, mtime and size of every .yaml file under the config
+        directory (plus the requested config name), so it changes whenever a
+        config file is added, removed or edited.
+
+        Args:
+            config_name: Name of the config file the result is for
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update((config_name or "config").encode())
+
+        stack = [str(self.conf_dir)]
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir():
+                        # New (even empty) group directories show up as groups
+                        digest.update(f"{entry.path}/\0".encode())
+                        stack.append(entry.path)
+                    elif entry.name.endswith('.yaml'):
+                        st = entry.stat()
+                        digest.update(f"{entry.path}\0{st.st_mtime_ns}\0{st.st_size}\0".encode())
+
+        return digest.hexdigest()
+
+    def parse_config_groups(self, config_name: str = None, include_configs: bool = True) -> Dict[str, Any]:
         """
         Parse Hydra configuration directory and extract config groups.
 
         Args:
             config_name: Name of the config file to use (e.g., "config_qwen2.5_1.5b").
                         If None, defaults to "config.yaml"
+            include_configs: If False, only list each group's options and leave
+                        out "configs", so option files are not parsed
 
         Returns:
             Dictionary structure:
@@ -74,6 +154,11 @@ class HydraParser:
                 "available_configs": ["config", "config_qwen2.5_1.5b", ...]
             }
         """
+        # A full parse also serves callers that only need the options
+        for key in ((config_name, True), (config_name, include_configs)):
+            if key in self._parsed:
+                return self._parsed[key]
+
         result = {
             "config_groups": {},
             "main_config": {},
@@ -87,36 +172,39 @@ class HydraParser:
             main_config_path = self.conf_dir / "config.yaml"
 
         if main_config_path.exists():
-            with open(main_config_path, 'r') as f:
-                result["main_config"] = yaml.safe_load(f) or {}
+            result["main_config"] = _load_yaml(main_config_path)
 
         # Extract defaults from main config
         defaults_map = self._extract_defaults(result["main_config"])
 
-        # Parse config groups (subdirectories in conf/)
-        for item in self.conf_dir.iterdir():
-            if item.is_dir() and not item.name.startswith('.'):
-                group_name = item.name
-                group_data = self._parse_group(item)
-
-                # Set the actual default from the defaults section
-                if group_name in defaults_map:
-                    default_value = defaults_map[group_name]
-
-                    # Check if it's a multi-value config (list)
-                    if isinstance(default_value, list):
-                        group_data["default"] = default_value
-                        group_data["multi_value"] = True
-                    else:
-                        group_data["default"] = default_value
-                        group_data["multi_value"] = False
+        # Parse config groups (subdirectories in conf/). DirEntry.is_dir() uses
+        # the file type from the directory listing, no stat per entry
+        with os.scandir(self.conf_dir) as entries:
+            group_dirs = [e for e in entries if not e.name.startswith('.') and e.is_dir()]
+
+        for item in group_dirs:
+            group_name = item.name
+            group_data = self._parse_group(item.path, include_configs)
+
+            # Set the actual default from the defaults section
+            if group_name in defaults_map:
+                default_value = defaults_map[group_name]
+
+                # Check if it's a multi-value config (list)
+                if isinstance(default_value, list):
+                    group_data["default"] = default_value
+                    group_data["multi_value"] = True
                 else:
-                    # Fallback to first option if no default specified
-                    group_data["default"] = group_data["options"][0] if group_data["options"] else None
+                    group_data["default"] = default_value
                     group_data["multi_value"] = False
+            else:
+                # Fallback to first option if no default specified
+                group_data["default"] = group_data["options"][0] if group_data["options"] else None
+                group_data["multi_value"] = False
 
-                result["config_groups"][group_name] = group_data
+            result["config_groups"][group_name] = group_data
 
+        self._parsed[(config_name, include_configs)] = result
         return result
 
     def _extract_defaults(self, main_config: Dict[str, Any]) -> Dict[str, str]:
@@ -149,32 +237,37 @@ class HydraParser:
 
         return defaults_map
 
-    def _parse_group(self, group_dir: Path) -> Dict[str, Any]:
+    def _parse_group(self, group_dir: str, include_configs: bool = True) -> Dict[str, Any]:
         """
         Parse a single config group directory.
 
         Args:
             group_dir: Path to group directory (e.g., conf/model/)
+            include_configs: If False, only list the options without parsing them
 
         Returns:
-            Dictionary with options and their configs
+            Dictionary with options and (if include_configs) their configs
         """
         options = []
         configs = {}
 
-        for yaml_file in group_dir.glob("*.yaml"):
-            option_name = yaml_file.stem
-            options.append(option_name)
+        with os.scandir(group_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".yaml"):
+                    continue
+                option_name = entry.name[:-len(".yaml")]
+                options.append(option_name)
 
-            with open(yaml_file, 'r') as f:
-                config_content = yaml.safe_load(f) or {}
-                configs[option_name] = config_content
+                if include_configs:
+                    configs[option_name] = _load_yaml(entry.path)
 
-        return {
+        group_data = {
             "options": sorted(options),
-            "configs": configs,
             "default": None  # Will be set by parse_config_groups
         }
+        if include_configs:
+            group_data["configs"] = configs
+        return group_data
 
     def build_ui_schema(self, config_name: str = None) -> Dict[str, Any]:
         """
@@ -187,7 +280,8 @@ class HydraParser:
         Returns a simplified structure that the frontend can use to
         create dropdowns, text inputs, etc.
         """
-        parsed = self.parse_config_groups(config_name)
+        # The UI only offers each group's options, their contents aren't needed
+        parsed = self.parse_config_groups(config_name, include_configs=False)
         ui_schema = {
             "groups": [],
             "parameters": []
@@ -213,6 +307,9 @@ class HydraParser:
         """
         Extract parameters suitable for UI input from config.
 
+        Nested configs are walked with an explicit stack of item iterators, so
+        parameters come out in the same depth-first order as a recursive walk.
+
         Args:
             config: Configuration dictionary
             prefix: Key prefix for nested parameters
@@ -221,34 +318,36 @@ class HydraParser:
             List of parameter definitions for UI
         """
         parameters = []
-        skip_keys = {"defaults", "hydra", "logger"}  # Skip special Hydra keys
-
-        for key, value in config.items():
-            if key in skip_keys:
-                continue
-
-            # Skip interpolations (${...})
-            if isinstance(value, str) and "${" in value:
-                continue
-
-            # Handle nested configs (but not config sections that represent objects)
-            if isinstance(value, dict):
-                # If the dict has _target_, it's an object instantiation, skip it
-                if "_target_" not in value:
-                    # Recurse into nested configs
-                    nested = self._extract_ui_parameters(value, prefix=f"{prefix}{key}.")
-                    parameters.extend(nested)
+        stack = [(prefix, iter(config.items()))]
+
+        while stack:
+            prefix, items = stack[-1]
+            for key, value in items:
+                if key in UI_SKIP_KEYS:
+                    continue
+
+                # Skip interpolations (${...})
+                if isinstance(value, str) and "${" in value:
+                    continue
+
+                # Handle nested configs (but not config sections that represent objects)
+                if isinstance(value, dict):
+                    # If the dict has _target_, it's an object instantiation, skip it
+                    if "_target_" not in value:
+                        # Descend into the nested config, resume this one afterwards
+                        stack.append((f"{prefix}{key}.", iter(value.items())))
+                        break
+                else:
+                    # This is a configurable parameter
+                    parameters.append({
+                        "key": f"{prefix}{key}",
+                        "type": self._infer_param_type(value),
+                        "default": value,
+                        "label": key.replace("_", " ").title()
+                    })
             else:
-                # This is a configurable parameter
-                param_key = f"{prefix}{key}"
-                param_type = self._infer_param_type(value)
-
-                parameters.append({
-                    "key": param_key,
-                    "type": param_type,
-                    "default": value,
-                    "label": key.replace("_", " ").title()
-                })
+                # Finished this level
+                stack.pop()
 
         return parameters
 
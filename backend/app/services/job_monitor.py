@@ -1,8 +1,46 @@
+import logging
 import re
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from app.core.ssh_manager import SSHManager
 
+logger = logging.getLogger(__name__)
+
+# Printed before each job's sbatch output in batched submissions
+_BATCH_MARKER = "__MLOPS_JOB__"
+
+# Strips everything up to the last carriage return on each line (progress bar
+# redraws) and drops intermediate percentage updates like " 42%|", keeping 100%.
+# Exits 1 if nothing is left, so callers can fall back to the raw log.
+_LOG_FILTER = (
+    "awk '{ sub(/.*\\r/, \"\") } "
+    "!/[[:space:]][0-9][0-9]?%[|]/ { print; n++ } "
+    "END { exit !n }'"
+)
+
+# sbatch's success message
+_SUBMITTED_JOB_RE = re.compile(r'Submitted batch job (\d+)')
+
+# SLURM state -> simplified status; states not listed are passed through
+_SLURM_STATUS_MAP = {
+    "PENDING": "PENDING",
+    "CONFIGURING": "PENDING",
+    "RUNNING": "RUNNING",
+    "COMPLETED": "COMPLETED",
+    "FAILED": "FAILED",
+    "TIMEOUT": "FAILED",
+    "OUT_OF_MEMORY": "FAILED",
+    "NODE_FAIL": "FAILED",
+    "CANCELLED": "CANCELLED",
+    "CANCELED": "CANCELLED",
+}
+
+# Any WandB URL; extract_wandb_url ranks matches by what precedes them on their line
+_WANDB_URL_RE = re.compile(r'https://wandb\.ai/[^\s]+')
+
+# The same URL as an extended regex for grep on the cluster
+_WANDB_URL_GREP = "https://wandb\\.ai/[^[:space:]]+"
+
 
 class JobMonitor:
     """Service for monitoring SLURM job status and logs."""
@@ -17,6 +55,10 @@ class JobMonitor:
         """
         self.ssh = ssh_manager
         self.use_login_shell = use_login_shell
+        # get_job_status() results for this monitor's lifetime (one request or
+        # poll), so repeated lookups of a job within it cost one SSH round-trip.
+        # Format: {slurm_job_id: (status, reason, runtime_seconds)}
+        self._status_cache: Dict[str, Tuple[str, Optional[str], Optional[int]]] = {}
 
     def get_job_status(self, slurm_job_id: str) -> Tuple[str, Optional[str], Optional[int]]:
         """
@@ -29,33 +71,100 @@ class JobMonitor:
             Tuple of (status, reason, runtime_seconds)
             Status can be: PENDING, RUNNING, COMPLETED, FAILED, CANCELLED
             Runtime is in seconds, None if not available
+
+        Results are reused for the lifetime of this JobMonitor, create a new
+        one to get a fresh status.
         """
-        # First try squeue (for running/pending jobs) - also get runtime
-        cmd = f"squeue -j {slurm_job_id} -h -o '%T %M'"
+        if slurm_job_id not in self._status_cache:
+            self._status_cache[slurm_job_id] = self._query_job_status(slurm_job_id)
+        return self._status_cache[slurm_job_id]
+
+    def _query_job_status(self, slurm_job_id: str) -> Tuple[str, Optional[str], Optional[int]]:
+        """Query squeue/sacct for a job, see get_job_status()."""
+        # One round-trip: squeue for running/pending jobs, sacct for jobs that
+        # have left the queue. The prefix says which one answered.
+        cmd = (
+            f"out=$(squeue -j {slurm_job_id} -h -o '%T %M' 2>/dev/null); "
+            f"if [ -n \"$out\" ]; then echo \"Q:$out\"; "
+            f"else sacct -j {slurm_job_id} -n -o State,Elapsed --parsable2 | head -n 1 | sed 's/^/A:/'; fi"
+        )
         stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+        output = stdout.strip()
+
+        if output.startswith("Q:"):
+            # squeue: "STATE ELAPSED"
+            parts = output[2:].split()
+        elif output.startswith("A:"):
+            # sacct: "State|Elapsed"
+            parts = output[2:].split('|')
+        else:
+            parts = None
 
-        if exit_code == 0 and stdout.strip():
-            parts = stdout.strip().split()
-            status = parts[0] if parts else "UNKNOWN"
+        if parts:
+            status = parts[0]
             runtime_str = parts[1] if len(parts) > 1 else None
             runtime_seconds = self._parse_slurm_time(runtime_str) if runtime_str else None
             return self._normalize_status(status), None, runtime_seconds
 
-        # If not in queue, check sacct (for completed/failed jobs)
-        cmd = f"sacct -j {slurm_job_id} -n -o State,Elapsed --parsable2"
-        stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+        return "UNKNOWN", "Job not found in squeue or sacct", None
 
-        if exit_code == 0 and stdout.strip():
-            lines = stdout.strip().split('\n')
-            if lines:
-                # Parse first line: State|Elapsed
-                parts = lines[0].split('|')
-                status = parts[0] if parts else "UNKNOWN"
-                runtime_str = parts[1] if len(parts) > 1 else None
-                runtime_seconds = self._parse_slurm_time(runtime_str) if runtime_str else None
-                return self._normalize_status(status), None, runtime_seconds
+    def get_job_statuses(self, slurm_job_ids: List[str]) -> Dict[str, Tuple[str, Optional[int]]]:
+        """
+        Query SLURM status and runtime for many jobs with batched calls.
 
-        return "UNKNOWN", "Job not found in squeue or sacct", None
+        One squeue call covers queued and running jobs, one sacct call the
+        ones that have left the queue. Jobs neither of them returned (sacct
+        failing, accounting lag, purged records) fall back to get_job_status()
+        one by one, so they still end up UNKNOWN rather than being skipped.
+
+        Args:
+            slurm_job_ids: SLURM job IDs
+
+        Returns:
+            Dict of {slurm_job_id: (status, runtime_seconds)} for every job,
+            status is UNKNOWN for jobs SLURM has no record of.
+        """
+        if not slurm_job_ids:
+            return {}
+
+        statuses = {}
+
+        # squeue exits nonzero if some IDs already left the queue, but still
+        # prints the others, so parse whatever came back
+        cmd = f"squeue -h -j {','.join(slurm_job_ids)} -o '%i|%T|%M' 2>/dev/null"
+        stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+        for line in stdout.splitlines():
+            parts = line.strip().split('|')
+            if len(parts) < 3 or not parts[1]:
+                continue
+            job_id, state, elapsed = parts[:3]
+            statuses[job_id] = (self._normalize_status(state), self._parse_slurm_time(elapsed))
+
+        missing = [job_id for job_id in slurm_job_ids if job_id not in statuses]
+        if missing:
+            # -X: allocations only (no .batch/.extern steps), -P: '|' separated
+            cmd = f"sacct -j {','.join(missing)} -X -n -P -o JobID,State,ElapsedRaw"
+            stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+
+            if exit_code != 0:
+                # E.g. accounting disabled; the per-job fallback below still works
+                logger.warning(f"sacct failed on {self.ssh.host}: {stderr.strip()}")
+            else:
+                for line in stdout.splitlines():
+                    parts = line.split('|')
+                    if len(parts) < 3 or not parts[1]:
+                        continue
+                    job_id, state, elapsed = parts[:3]
+                    # State can carry a suffix, e.g. "CANCELLED by 1234"
+                    status = self._normalize_status(state.split()[0])
+                    statuses[job_id] = (status, int(elapsed) if elapsed.isdigit() else None)
+
+        for job_id in slurm_job_ids:
+            if job_id not in statuses:
+                status, reason, runtime_seconds = self.get_job_status(job_id)
+                statuses[job_id] = (status, runtime_seconds)
+
+        return statuses
 
     def get_job_logs(self, log_path: str, tail_lines: int = None, max_lines: int = None) -> str:
         """
@@ -69,13 +178,16 @@ class JobMonitor:
         Returns:
             Log content (with carriage returns cleaned and progress bars filtered)
         """
+        # Filter out intermediate progress bar updates in one awk pass
+        # (reading the file directly when the whole log is wanted)
         if tail_lines is not None:
-            # User specified number of lines - just get those with simple tail
-            cmd = f"tail -n {tail_lines} {log_path}"
+            # Run tail once, so a missing file reports its error once
+            cmd = (
+                f"out=$(tail -n {tail_lines} {log_path}) || exit; "
+                f"printf '%s\\n' \"$out\" | {_LOG_FILTER} || printf '%s\\n' \"$out\""
+            )
         else:
-            # Fetch full file but filter out intermediate progress bar updates
-            # Keep lines with 100% and skip intermediate percentage updates
-            cmd = f"cat {log_path} | sed 's/.*\\r//g' | grep -v -E '\\s+[0-9]{{1,2}}%\\|' || cat {log_path}"
+            cmd = f"{_LOG_FILTER} {log_path} || cat {log_path}"
 
         # Use longer timeout for log fetching (up to 2 minutes)
         stdout, stderr, exit_code = self.ssh.execute_command(
@@ -89,46 +201,42 @@ class JobMonitor:
         else:
             return f"Error fetching logs: {stderr}"
 
-    @staticmethod
-    def _clean_progress_bars(log_content: str) -> str:
+    def find_wandb_urls(self, log_paths: List[str]) -> List[Optional[str]]:
         """
-        Clean up carriage return (\r) based progress bars from log content.
+        Find the WandB run URLs in several log files with a single SSH command.
 
-        Progress bars use \r to overwrite lines. In terminal this looks clean,
-        but in raw logs it creates thousands of lines. We keep only the final
-        state of each progress bar sequence.
+        Same whole-file grep as find_wandb_url(), so the URL is found however
+        much the job has logged since printing it.
 
         Args:
-            log_content: Raw log content with \r characters
+            log_paths: Paths to SLURM output files on cluster
 
         Returns:
-            Cleaned log content with only final progress bar states
+            WandB URL (or None if not found) per file, in the same order as
+            log_paths. None for files that don't exist (yet).
         """
-        if '\r' not in log_content:
-            # No carriage returns, return as-is
-            return log_content
-
-        lines = []
-        current_line = ""
-
-        for char in log_content:
-            if char == '\r':
-                # Carriage return - reset current line
-                current_line = ""
-            elif char == '\n':
-                # Newline - save current line and start new one
-                if current_line:  # Only add non-empty lines
-                    lines.append(current_line)
-                current_line = ""
-            else:
-                # Regular character
-                current_line += char
+        # Marker line before each file's match, so output can be split per file
+        cmd = "; ".join(
+            f"echo '{_BATCH_MARKER} {i}'; "
+            f"grep -m1 -Eo 'View run at {_WANDB_URL_GREP}' {path} 2>/dev/null "
+            f"|| grep -m1 -Eo '{_WANDB_URL_GREP}' {path} 2>/dev/null"
+            for i, path in enumerate(log_paths)
+        )
+        stdout, stderr, exit_code = self.ssh.execute_command(
+            cmd,
+            use_login_shell=self.use_login_shell,
+            timeout=120
+        )
 
-        # Don't forget the last line if there's no trailing newline
-        if current_line:
-            lines.append(current_line)
+        urls: List[Optional[str]] = [None] * len(log_paths)
+        current = None
+        for line in stdout.splitlines():
+            if line.startswith(_BATCH_MARKER):
+                current = int(line.split()[1])
+            elif current is not None and line.strip() and urls[current] is None:
+                urls[current] = line.strip().split()[-1]
 
-        return '\n'.join(lines)
+        return urls
 
     def extract_wandb_url(self, log_content: str) -> Optional[str]:
         """
@@ -144,36 +252,85 @@ class JobMonitor:
         Returns:
             WandB URL if found, None otherwise
         """
-        # Common WandB URL patterns
-        patterns = [
-            r'View run at (https://wandb\.ai/[^\s]+)',
-            r'wandb: .*?(https://wandb\.ai/[^\s]+)',
-            r'(https://wandb\.ai/[^\s]+)'
-        ]
+        # Plain substring scan; most logs have no URL and skip the regexes entirely
+        if 'https://wandb.ai/' not in log_content:
+            return None
 
-        for pattern in patterns:
-            match = re.search(pattern, log_content)
-            if match:
-                return match.group(1).strip()
+        # Single pass over the URLs, ranked most specific first:
+        # "View run at <url>", then <url> after "wandb: " on its line, then any <url>
+        wandb_line_url = None
+        first_url = None
+        for match in _WANDB_URL_RE.finditer(log_content):
+            start = match.start()
+            line_prefix = log_content[log_content.rfind('\n', 0, start) + 1:start]
+            if line_prefix.endswith('View run at '):
+                return match.group()
+            if wandb_line_url is None and 'wandb: ' in line_prefix:
+                wandb_line_url = match.group()
+            if first_url is None:
+                first_url = match.group()
+
+        return wandb_line_url or first_url
+
+    def find_wandb_url(self, log_path: str) -> Optional[str]:
+        """
+        Find the WandB run URL in a log file without fetching the log.
+
+        Runs grep on the cluster and stops at the first match, preferring
+        "View run at <url>" lines over any other wandb.ai URL (wandb prints
+        the project URL before the run URL).
 
-        return None
+        Args:
+            log_path: Path to SLURM output file on cluster
 
-    def submit_job(self, sbatch_script_path: str) -> Tuple[str, Optional[str]]:
+        Returns:
+            WandB URL if found, None otherwise
+        """
+        cmd = (
+            f"grep -m1 -Eo 'View run at {_WANDB_URL_GREP}' {log_path} "
+            f"|| grep -m1 -Eo '{_WANDB_URL_GREP}' {log_path}"
+        )
+        stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+
+        if exit_code != 0 or not stdout.strip():
+            return None
+
+        return stdout.strip().split()[-1]
+
+    def submit_job(
+        self,
+        sbatch_script_path: str,
+        script_content: Optional[str] = None,
+        make_dirs: Optional[List[str]] = None
+    ) -> Tuple[str, Optional[str]]:
         """
         Submit a SLURM job via sbatch.
 
         Args:
             sbatch_script_path: Path to sbatch script on remote cluster
+            script_content: If given, the script is piped over stdin, written to
+                           sbatch_script_path and made executable before sbatch,
+                           all in the same SSH command
+            make_dirs: Remote directories to create (mkdir -p) before submitting
 
         Returns:
             Tuple of (slurm_job_id, error_message)
         """
         cmd = f"sbatch {sbatch_script_path}"
-        stdout, stderr, exit_code = self.ssh.execute_command(cmd, use_login_shell=self.use_login_shell)
+        if script_content is not None:
+            cmd = f"cat > {sbatch_script_path} && chmod +x {sbatch_script_path} && {cmd}"
+        if make_dirs:
+            cmd = f"mkdir -p {' '.join(make_dirs)} && {cmd}"
+
+        stdout, stderr, exit_code = self.ssh.execute_command(
+            cmd,
+            use_login_shell=self.use_login_shell,
+            stdin_data=script_content
+        )
 
         if exit_code == 0:
             # Parse job ID from output: "Submitted batch job 12345"
-            match = re.search(r'Submitted batch job (\d+)', stdout)
+            match = _SUBMITTED_JOB_RE.search(stdout)
             if match:
                 job_id = match.group(1)
                 return job_id, None
@@ -182,6 +339,60 @@ class JobMonitor:
         else:
             return None, f"sbatch failed: {stderr}"
 
+    def submit_jobs(
+        self,
+        scripts: List[Tuple[str, str]],
+        make_dirs: Optional[List[str]] = None
+    ) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Write and submit several SLURM jobs with a single SSH command.
+
+        A shell script is piped to 'bash -s' that writes each sbatch script
+        with a heredoc and submits it, printing a marker line before each
+        job's output so results can be matched back to the scripts.
+
+        Args:
+            scripts: List of (sbatch_script_path, script_content)
+            make_dirs: Remote directories to create (mkdir -p) before submitting
+
+        Returns:
+            List of (slurm_job_id, error_message), in the same order as scripts
+        """
+        lines = []
+        if make_dirs:
+            lines.append(f"mkdir -p {' '.join(make_dirs)}")
+
+        for i, (path, content) in enumerate(scripts):
+            delimiter = f"MLOPS_SCRIPT_EOF_{i}"
+            lines.append(f"echo '{_BATCH_MARKER} {i}'")
+            lines.append(f"cat > {path} <<'{delimiter}'\n{content.rstrip(chr(10))}\n{delimiter}")
+            lines.append(f"chmod +x {path} && sbatch {path} 2>&1")
+
+        stdout, stderr, exit_code = self.ssh.execute_command(
+            "bash -s",
+            use_login_shell=self.use_login_shell,
+            stdin_data="\n".join(lines) + "\n"
+        )
+
+        # Split output into per-job sections on the marker lines
+        outputs = [""] * len(scripts)
+        current = None
+        for line in stdout.splitlines():
+            if line.startswith(_BATCH_MARKER):
+                current = int(line.split()[1])
+            elif current is not None:
+                outputs[current] += line + "\n"
+
+        results = []
+        for output in outputs:
+            match = _SUBMITTED_JOB_RE.search(output)
+            if match:
+                results.append((match.group(1), None))
+            else:
+                results.append((None, f"sbatch failed: {output.strip() or stderr.strip()}"))
+
+        return results
+
     @staticmethod
     def _parse_slurm_time(time_str: str) -> Optional[int]:
         """
@@ -238,16 +449,4 @@ class JobMonitor:
         - CANCELLED -> CANCELLED
         """
         status = status.upper()
-
-        if status in ["PENDING", "CONFIGURING"]:
-            return "PENDING"
-        elif status in ["RUNNING"]:
-            return "RUNNING"
-        elif status in ["COMPLETED"]:
-            return "COMPLETED"
-        elif status in ["FAILED", "TIMEOUT", "OUT_OF_MEMORY", "NODE_FAIL"]:
-            return "FAILED"
-        elif status in ["CANCELLED", "CANCELED"]:
-            return "CANCELLED"
-        else:
-            return status
+        return _SLURM_STATUS_MAP.get(status, status)
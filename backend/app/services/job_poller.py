@@ -1,20 +1,25 @@
 """Background service for polling SLURM job status."""
 
 import logging
-import yaml
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from pathlib import Path
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import load_only
 from app.core.database import SessionLocal
-from app.core.config import settings
-from app.core.ssh_manager import SSHManager
+from app.core.cluster_config import load_clusters_config
+from app.core.ssh_manager import SSHTarget, ssh_pool
 from app.models.job import Job
 from app.services.job_monitor import JobMonitor
 
 logger = logging.getLogger(__name__)
 
+# Most clusters polled at once
+MAX_PARALLEL_CLUSTER_POLLS = 8
+
+# Upper bound on polls skipped between WandB URL lookups for a running job
+MAX_WANDB_SKIPPED_POLLS = 10
+
 
 class JobStatusPoller:
     """Background service to periodically poll SLURM clusters for job status."""
@@ -23,6 +28,11 @@ class JobStatusPoller:
         """Initialize the job status poller."""
         self.running = False
 
+        # Running jobs whose logs had no WandB URL yet, retried with exponential
+        # backoff so each poll doesn't tail every such log again.
+        # Format: {job_id: (misses so far, polls left to skip)}
+        self._wandb_retries: Dict[str, Tuple[int, int]] = {}
+
     def poll_all_jobs(self):
         """
         Poll all active jobs and update their statuses.
@@ -30,8 +40,8 @@ class JobStatusPoller:
         This function:
         1. Queries DB for jobs that might need status updates
         2. Groups jobs by cluster
-        3. For each cluster, SSHs in and checks all job statuses
-        4. Updates the database with new statuses
+        3. SSHs into the clusters in parallel and checks all job statuses
+        4. Writes the changed statuses back in one bulk UPDATE
         """
         if self.running:
             logger.debug("Poll already in progress, skipping...")
@@ -43,7 +53,10 @@ class JobStatusPoller:
             try:
                 # Get jobs that are not in terminal states
                 active_statuses = ["PENDING", "RUNNING", "CONFIGURING", "SUBMITTING"]
-                active_jobs = db.query(Job).filter(
+                active_jobs = db.query(Job).options(load_only(
+                    Job.id, Job.name, Job.cluster, Job.slurm_job_id,
+                    Job.slurm_status, Job.runtime_seconds, Job.wandb_run_url
+                )).filter(
                     Job.slurm_status.in_(active_statuses),
                     Job.slurm_job_id.isnot(None)
                 ).all()
@@ -54,6 +67,12 @@ class JobStatusPoller:
 
                 logger.info(f"Polling {len(active_jobs)} active jobs")
 
+                # Forget backoff state of jobs that finished
+                active_ids = {job.id for job in active_jobs}
+                self._wandb_retries = {
+                    job_id: retry for job_id, retry in self._wandb_retries.items() if job_id in active_ids
+                }
+
                 # Group jobs by cluster
                 jobs_by_cluster = {}
                 for job in active_jobs:
@@ -61,20 +80,39 @@ class JobStatusPoller:
                         jobs_by_cluster[job.cluster] = []
                     jobs_by_cluster[job.cluster].append(job)
 
-                # Load cluster config
-                with open(settings.clusters_config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                    clusters = {c['name']: c for c in config.get('clusters', [])}
+                # Load cluster config (cached, indexed by name at load time)
+                clusters = load_clusters_config()
 
-                # Poll each cluster
+                # Column values to write back, collected across clusters
+                # Format: [{"id": job_id, column: value, ...}]
+                updates: List[Dict] = []
+
+                # Clusters to poll, as _poll_cluster_jobs() arguments
+                polls = []
                 for cluster_name, jobs in jobs_by_cluster.items():
-                    if cluster_name not in clusters:
+                    if cluster_name not in clusters.by_name:
                         logger.error(f"Cluster {cluster_name} not found in config")
                         continue
 
-                    self._poll_cluster_jobs(cluster_name, clusters[cluster_name], jobs, db)
+                    target = clusters.ssh_targets.get(cluster_name)
+                    if target is None:
+                        logger.error(f"Invalid host format for cluster {cluster_name}")
+                        continue
+
+                    polls.append((cluster_name, clusters.by_name[cluster_name], target, jobs))
+
+                # Poll clusters in parallel, so one slow cluster doesn't hold up
+                # the rest. The DB is only touched from this thread.
+                if len(polls) == 1:
+                    updates.extend(self._poll_cluster_jobs(*polls[0]))
+                elif polls:
+                    with ThreadPoolExecutor(max_workers=min(len(polls), MAX_PARALLEL_CLUSTER_POLLS)) as pool:
+                        for cluster_updates in pool.map(lambda args: self._poll_cluster_jobs(*args), polls):
+                            updates.extend(cluster_updates)
 
-                db.commit()
+                if updates:
+                    db.bulk_update_mappings(Job, updates)
+                    db.commit()
 
             finally:
                 db.close()
@@ -88,97 +126,130 @@ class JobStatusPoller:
         self,
         cluster_name: str,
         cluster_config: Dict,
-        jobs: list,
-        db: Session
-    ):
+        target: SSHTarget,
+        jobs: list
+    ) -> List[Dict]:
         """
         Poll all jobs on a specific cluster.
 
         Args:
             cluster_name: Name of the cluster
             cluster_config: Cluster configuration dict
+            target: SSH connection parameters for the cluster
             jobs: List of Job objects to poll
-            db: Database session
+
+        Returns:
+            Column updates for the jobs that changed, as {"id": job_id, column: value}
         """
+        updates = []
         try:
-            # Parse host
-            if '@' in cluster_config['host']:
-                username, hostname = cluster_config['host'].split('@')
-            else:
-                logger.error(f"Invalid host format for cluster {cluster_name}")
-                return
-
-            # Connect to cluster
-            ssh = SSHManager(
-                host=hostname,
-                username=username,
-                key_path=cluster_config['ssh_key_path']
-            )
-
-            with ssh:
-                use_login = cluster_config.get('use_login_shell', False)
-                job_monitor = JobMonitor(ssh, use_login_shell=use_login)
-
-                # Check status for each job
-                for job in jobs:
-                    try:
-                        status, reason, runtime_seconds = job_monitor.get_job_status(job.slurm_job_id)
-
-                        if status != job.slurm_status:
-                            logger.info(
-                                f"Job {job.name} ({job.slurm_job_id}): "
-                                f"{job.slurm_status} -> {status}"
-                            )
-                            job.slurm_status = status
-                            job.updated_at = datetime.utcnow()
-
-                        # Update runtime
-                        if runtime_seconds is not None:
-                            job.runtime_seconds = runtime_seconds
-
-                        # Extract WandB URL if job is running and we don't have it yet
-                        if status == "RUNNING" and not job.wandb_run_url:
-                            self._try_extract_wandb_url(job, job_monitor, cluster_config)
-
-                    except Exception as e:
-                        logger.error(
-                            f"Error checking status for job {job.id} "
-                            f"(SLURM ID {job.slurm_job_id}): {e}"
-                        )
+            # Pooled connection, reused across polls and API requests
+            ssh = ssh_pool.get(*target)
+
+            use_login = cluster_config.get('use_login_shell', False)
+            job_monitor = JobMonitor(ssh, use_login_shell=use_login)
+
+            # Batched squeue/sacct for every job on the cluster, per-job
+            # fallback for the ones neither knows about
+            statuses = job_monitor.get_job_statuses([job.slurm_job_id for job in jobs])
+
+            # Running jobs to search for a WandB URL, with their (possibly empty) update
+            wandb_lookups = []
+
+            for job in jobs:
+                status, runtime_seconds = statuses[job.slurm_job_id]
+                update = {}
+
+                if status != job.slurm_status:
+                    logger.info(
+                        f"Job {job.name} ({job.slurm_job_id}): "
+                        f"{job.slurm_status} -> {status}"
+                    )
+                    update["slurm_status"] = status
+                    update["updated_at"] = datetime.utcnow()
+
+                # Update runtime
+                if runtime_seconds is not None and runtime_seconds != job.runtime_seconds:
+                    update["runtime_seconds"] = runtime_seconds
+
+                # Extract WandB URL if job is running and we don't have it yet
+                if status == "RUNNING" and not job.wandb_run_url and self._wandb_lookup_due(job.id):
+                    wandb_lookups.append((job, update))
+
+                if update:
+                    update["id"] = job.id
+                    updates.append(update)
+
+            # One SSH command searches the logs of every job still missing its URL
+            if wandb_lookups:
+                wandb_urls = self._try_extract_wandb_urls(
+                    [job for job, _ in wandb_lookups], job_monitor, cluster_config
+                )
+                for (job, update), wandb_url in zip(wandb_lookups, wandb_urls):
+                    if wandb_url:
+                        if not update:
+                            # Nothing else changed, so it isn't in updates yet
+                            update["id"] = job.id
+                            updates.append(update)
+                        update["wandb_run_url"] = wandb_url
+                        self._wandb_retries.pop(job.id, None)
+                    else:
+                        # Skip 0, 1, 3, 7, ... polls before looking again
+                        misses = self._wandb_retries.get(job.id, (0, 0))[0] + 1
+                        skip = min(2 ** (misses - 1) - 1, MAX_WANDB_SKIPPED_POLLS)
+                        self._wandb_retries[job.id] = (misses, skip)
 
         except Exception as e:
-            logger.error(f"Error connecting to cluster {cluster_name}: {e}")
+            logger.error(f"Error polling jobs on cluster {cluster_name}: {e}")
+
+        return updates
+
+    def _wandb_lookup_due(self, job_id: str) -> bool:
+        """Check whether a running job's log should be searched for its WandB URL this poll."""
+        retry = self._wandb_retries.get(job_id)
+        if retry is None or retry[1] == 0:
+            return True
+
+        misses, skip = retry
+        self._wandb_retries[job_id] = (misses, skip - 1)
+        return False
 
-    def _try_extract_wandb_url(
+    def _try_extract_wandb_urls(
         self,
-        job: Job,
+        jobs: List[Job],
         job_monitor: JobMonitor,
         cluster_config: Dict
-    ):
+    ) -> List[Optional[str]]:
         """
-        Try to extract WandB URL from job logs.
+        Try to extract WandB URLs from the logs of several jobs on one cluster.
 
         Args:
-            job: Job object
+            jobs: Job objects, all on the cluster job_monitor is connected to
             job_monitor: JobMonitor instance
             cluster_config: Cluster configuration dict
+
+        Returns:
+            WandB URL (or None if not found) per job, in the same order as jobs
         """
         try:
-            # Construct log file path
-            log_path = f"{cluster_config['workspace']}/logs/{job.name}-{job.slurm_job_id}.out"
+            # Construct log file paths
+            log_paths = [
+                f"{cluster_config['workspace']}/logs/{job.name}-{job.slurm_job_id}.out"
+                for job in jobs
+            ]
 
-            # Fetch recent logs (more lines to ensure we catch WandB URL)
-            logs = job_monitor.get_job_logs(log_path, tail_lines=200)
+            # grep the whole file, the URL is printed once near the start
+            wandb_urls = job_monitor.find_wandb_urls(log_paths)
 
-            # Extract WandB URL
-            wandb_url = job_monitor.extract_wandb_url(logs)
+        except Exception as e:
+            logger.debug(f"Could not search logs for WandB URLs: {e}")
+            return [None] * len(jobs)
 
+        for job, wandb_url in zip(jobs, wandb_urls):
             if wandb_url:
                 logger.info(f"Extracted WandB URL for job {job.name}: {wandb_url}")
-                job.wandb_run_url = wandb_url
 
-        except Exception as e:
-            logger.debug(f"Could not extract WandB URL for job {job.name}: {e}")
+        return wandb_urls
 
 
 # Global poller instance
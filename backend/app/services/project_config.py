@@ -1,6 +1,18 @@
 from pathlib import Path
+import os
 import yaml
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+# Loaded configs per project path.
+# Format: {project_path: ((mtime_ns, size) of .mlops-config.yaml or None if missing, ProjectConfig)}
+_config_cache: Dict[str, Tuple[Optional[Tuple[int, int]], "ProjectConfig"]] = {}
 
 
 class ProjectConfig:
@@ -17,6 +29,34 @@ class ProjectConfig:
         self.config_file = self.project_path / ".mlops-config.yaml"
         self._config = None
 
+    @classmethod
+    def cached(cls, project_path: str) -> "ProjectConfig":
+        """
+        Get the loaded config for a project, re-reading it only if
+        .mlops-config.yaml changed (or appeared/disappeared) since last time.
+
+        Args:
+            project_path: Path to project root directory
+
+        Returns:
+            Loaded ProjectConfig. Shared between callers, do not mutate.
+        """
+        config_file = os.path.join(os.path.expanduser(project_path), ".mlops-config.yaml")
+        try:
+            st = os.stat(config_file)
+            version = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            version = None
+
+        cached = _config_cache.get(project_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        config = cls(project_path)
+        config.load()
+        _config_cache[project_path] = (version, config)
+        return config
+
     def load(self) -> Dict[str, Any]:
         """
         Load project configuration from .mlops-config.yaml.
@@ -41,7 +81,7 @@ class ProjectConfig:
         if self.config_file.exists():
             try:
                 with open(self.config_file, 'r') as f:
-                    user_config = yaml.safe_load(f) or {}
+                    user_config = yaml.load(f, Loader=SafeLoader) or {}
                     self._config.update(user_config)
             except Exception as e:
                 # If config file is invalid, use defaults
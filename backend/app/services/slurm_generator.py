@@ -1,10 +1,16 @@
 from jinja2 import Template
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+import os
 
 from app.core.config import settings
 
 
+# Generators with compiled templates, per template path.
+# Format: {template_path: ((mtime_ns, size) of the template, SlurmScriptGenerator)}
+_generator_cache: Dict[str, Tuple[Tuple[int, int], "SlurmScriptGenerator"]] = {}
+
+
 class SlurmScriptGenerator:
     """Service for generating SLURM batch scripts from templates."""
 
@@ -27,6 +33,34 @@ class SlurmScriptGenerator:
         with open(self.template_path, 'r') as f:
             self.template = Template(f.read())
 
+    @classmethod
+    def cached(cls, template_path: str | None = None) -> "SlurmScriptGenerator":
+        """
+        Get a generator whose template is compiled once and reused until the
+        template file changes on disk.
+
+        Args:
+            template_path: Path to Jinja2 template file.
+                          If None, uses default from settings.
+
+        Returns:
+            Shared SlurmScriptGenerator (rendering is thread-safe)
+        """
+        path = str(template_path or settings.slurm_template_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            raise FileNotFoundError(f"SLURM template not found: {path}")
+        version = (st.st_mtime_ns, st.st_size)
+
+        cached = _generator_cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        generator = cls(path)
+        _generator_cache[path] = (version, generator)
+        return generator
+
     def generate_script(
         self,
         job_name: str,
@@ -124,11 +158,11 @@ class SlurmScriptGenerator:
         Returns:
             Complete python command string
         """
-        cmd = f"python3 {script_path}"
+        parts = [f"python3 {script_path}"]
 
         # Add --config-name first if specified (must come before other overrides)
         if config_name:
-            cmd += f" --config-name {config_name}"
+            parts.append(f"--config-name {config_name}")
 
         # Add structured overrides from dropdowns first
         if hydra_overrides:
@@ -137,18 +171,18 @@ class SlurmScriptGenerator:
                 if isinstance(value, str) and ' ' in value:
                     # Escape double quotes for bash
                     escaped_value = value.replace('"', '\\"')
-                    cmd += f' {key}=\\"{escaped_value}\\"'
+                    parts.append(f'{key}=\\"{escaped_value}\\"')
                 else:
-                    cmd += f" {key}={value}"
+                    parts.append(f"{key}={value}")
 
         # Then add raw overrides (will override dropdown selections if same key)
         # This allows users to use both dropdowns AND add extra overrides
         if raw_hydra_overrides:
-            cmd += f" {raw_hydra_overrides.strip()}"
+            parts.append(raw_hydra_overrides.strip())
 
         # Use srun for multi-GPU (even single node) or multi-node
         # This properly initializes SLURM's task distribution for DDP
         if num_nodes > 1 or gpus_per_node > 1:
-            cmd = f"srun {cmd}"
+            parts.insert(0, "srun")
 
-        return cmd
+        return " ".join(parts)
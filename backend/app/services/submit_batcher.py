@@ -0,0 +1,94 @@
+"""Coalesces SLURM submissions to the same cluster into batches."""
+
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class SubmitBatcher:
+    """
+    Collects job IDs per cluster for a short window and hands each batch to
+    a flush callback on an executor.
+
+    Launching a sweep creates many jobs back-to-back; batching lets them share
+    one SSH command instead of paying a round-trip per job.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[str]], None],
+        executor: Executor,
+        window: float = 0.5,
+        max_batch: int = 20
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            flush: Called with a batch of job IDs (all for the same cluster)
+            executor: Executor the flush callback runs on
+            window: Seconds to wait for more jobs after the first one arrives
+            max_batch: Batch size at which a batch is submitted without waiting
+        """
+        self.flush = flush
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+
+        # Open batches still collecting job IDs
+        # Format: {cluster_name: [job_id, ...]}
+        self._pending: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, cluster_name: str, job_id: str) -> None:
+        """Queue a job for submission to a cluster."""
+        with self._lock:
+            batch = self._pending.get(cluster_name)
+            if batch is not None:
+                batch.append(job_id)
+                if len(batch) < self.max_batch:
+                    return
+                # Full, don't wait for the window to close
+                del self._pending[cluster_name]
+            else:
+                batch = [job_id]
+                self._pending[cluster_name] = batch
+
+        if len(batch) >= self.max_batch:
+            self._submit(cluster_name, batch)
+            return
+
+        timer = threading.Timer(self.window, self._close, args=(cluster_name, batch))
+        timer.daemon = True
+        timer.start()
+
+    def flush_pending(self) -> None:
+        """Submit all open batches now (e.g. on shutdown)."""
+        with self._lock:
+            batches = list(self._pending.items())
+            self._pending.clear()
+
+        for cluster_name, batch in batches:
+            self._submit(cluster_name, batch)
+
+    def _close(self, cluster_name: str, batch: List[str]) -> None:
+        """Stop collecting into a batch once its window is over and submit it."""
+        with self._lock:
+            if self._pending.get(cluster_name) is not batch:
+                # Already submitted (full, or flushed)
+                return
+            del self._pending[cluster_name]
+
+        self._submit(cluster_name, batch)
+
+    def _submit(self, cluster_name: str, batch: List[str]) -> None:
+        """Hand a batch to the flush callback on the executor."""
+        logger.debug(f"Submitting batch of {len(batch)} job(s) to {cluster_name}")
+        try:
+            self.executor.submit(self.flush, batch)
+        except RuntimeError as e:
+            # Executor already shut down
+            logger.error(f"Could not submit batch for {cluster_name}: {e}")
@@ -64,17 +64,15 @@ function JobActionsDropdown({
             </button>
 
             {/* View Script */}
-            {job.slurm_script && (
-              <button
-                onClick={() => handleAction(onViewScript)}
-                className="w-full text-left px-4 py-2 text-sm text-blue-400 hover:bg-dark-card-hover transition-colors flex items-center gap-2"
-              >
-                <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                  <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M10 20l4-16m4 4l4 4-4 4M6 16l-4-4 4-4" />
-                </svg>
-                View Script
-              </button>
-            )}
+            <button
+              onClick={() => handleAction(onViewScript)}
+              className="w-full text-left px-4 py-2 text-sm text-blue-400 hover:bg-dark-card-hover transition-colors flex items-center gap-2"
+            >
+              <svg className="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M10 20l4-16m4 4l4 4-4 4M6 16l-4-4 4-4" />
+              </svg>
+              View Script
+            </button>
 
             {/* View Logs */}
             {job.slurm_job_id && (
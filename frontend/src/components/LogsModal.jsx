@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import { getJobLogs } from '../services/api'
+import { getJobLogs, getJobLogStreamUrl } from '../services/api'
 
 function LogsModal({ jobId, jobName, onClose }) {
   const [logs, setLogs] = useState('')
@@ -70,13 +70,23 @@ function LogsModal({ jobId, jobName, onClose }) {
 
         {/* Footer */}
         <div className="flex justify-between items-center p-6 border-t border-dark-border">
-          <button
-            onClick={fetchLogs}
-            disabled={loading}
-            className="px-4 py-2 bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary rounded-md transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
-          >
-            Refresh
-          </button>
+          <div className="flex gap-2">
+            <button
+              onClick={fetchLogs}
+              disabled={loading}
+              className="px-4 py-2 bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary rounded-md transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+            >
+              Refresh
+            </button>
+            <a
+              href={getJobLogStreamUrl(jobId)}
+              target="_blank"
+              rel="noopener noreferrer"
+              className="px-4 py-2 bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary rounded-md transition-colors"
+            >
+              Full Log
+            </a>
+          </div>
           <button
             onClick={onClose}
             className="px-4 py-2 bg-accent-green hover:bg-accent-green-hover text-white rounded-md transition-colors"
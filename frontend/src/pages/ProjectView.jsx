@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useParams, Link, useNavigate } from 'react-router-dom'
 import toast from 'react-hot-toast'
-import { getProject, getJobs, syncProject, archiveJob, unarchiveJob } from '../services/api'
+import { getProject, getJobs, getJob, syncProject, archiveJob, unarchiveJob, refreshJobStatuses } from '../services/api'
 import ScriptPreviewModal from '../components/ScriptPreviewModal'
 import LogsModal from '../components/LogsModal'
 import JobActionsDropdown from '../components/JobActionsDropdown'
@@ -16,6 +16,7 @@ function ProjectView() {
   const [viewingScript, setViewingScript] = useState(null)
   const [viewingLogs, setViewingLogs] = useState(null)
   const [showArchived, setShowArchived] = useState(false)
+  const [refreshingStatuses, setRefreshingStatuses] = useState(false)
 
   useEffect(() => {
     fetchData()
@@ -67,6 +68,21 @@ function ProjectView() {
     }
   }
 
+  const handleViewScript = async (jobId) => {
+    // The job list omits scripts, so fetch the full job
+    try {
+      const job = await getJob(jobId)
+      if (job.slurm_script) {
+        setViewingScript(job.slurm_script)
+      } else {
+        toast.error('No SLURM script generated for this job yet')
+      }
+    } catch (error) {
+      console.error('Error loading job script:', error)
+      toast.error('Failed to load SLURM script')
+    }
+  }
+
   const handleCloneRun = (job) => {
     // Navigate to launch page with cloned job config in state
     navigate(`/project/${projectId}/launch`, {
@@ -94,6 +110,34 @@ function ProjectView() {
     })
   }
 
+  const handleRefreshStatuses = async () => {
+    // Only jobs still on the cluster can change; one bulk call covers all of them
+    const activeJobIds = jobs
+      .filter(job => job.slurm_job_id && ['PENDING', 'RUNNING', 'CONFIGURING'].includes(job.slurm_status))
+      .map(job => job.id)
+    if (activeJobIds.length === 0) {
+      toast('No active jobs to refresh')
+      return
+    }
+
+    try {
+      setRefreshingStatuses(true)
+      const result = await refreshJobStatuses(activeJobIds)
+      const errorCount = Object.keys(result.errors || {}).length
+      if (errorCount > 0) {
+        toast.error(`${result.message} (${errorCount} could not be refreshed)`)
+      } else {
+        toast.success(result.message)
+      }
+      fetchData(false)
+    } catch (error) {
+      console.error('Error refreshing job statuses:', error)
+      toast.error('Failed to refresh job statuses')
+    } finally {
+      setRefreshingStatuses(false)
+    }
+  }
+
   const handleSync = async () => {
     try {
       const updatedProject = await syncProject(projectId)
@@ -156,16 +200,25 @@ function ProjectView() {
       <div>
         <div className="flex justify-between items-center mb-4">
           <h2 className="text-2xl font-bold text-dark-text-primary">Job History</h2>
-          <button
-            onClick={() => setShowArchived(!showArchived)}
-            className={`px-4 py-2 rounded-md transition-colors ${
-              showArchived
-                ? 'bg-yellow-600 hover:bg-yellow-700 text-white'
-                : 'bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary border border-dark-border'
-            }`}
-          >
-            {showArchived ? 'Hide Archived' : 'Show Archived'}
-          </button>
+          <div className="flex gap-2">
+            <button
+              onClick={handleRefreshStatuses}
+              disabled={refreshingStatuses}
+              className="bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary border border-dark-border px-4 py-2 rounded-md transition-colors disabled:opacity-50"
+            >
+              {refreshingStatuses ? 'Refreshing...' : 'Refresh Statuses'}
+            </button>
+            <button
+              onClick={() => setShowArchived(!showArchived)}
+              className={`px-4 py-2 rounded-md transition-colors ${
+                showArchived
+                  ? 'bg-yellow-600 hover:bg-yellow-700 text-white'
+                  : 'bg-dark-bg hover:bg-dark-card-hover text-dark-text-primary border border-dark-border'
+              }`}
+            >
+              {showArchived ? 'Hide Archived' : 'Show Archived'}
+            </button>
+          </div>
         </div>
         {jobs.length === 0 ? (
           <div className="bg-dark-card p-8 rounded-lg border border-dark-border text-center text-dark-text-secondary">
@@ -273,7 +326,7 @@ function ProjectView() {
                       <JobActionsDropdown
                         job={job}
                         showArchived={showArchived}
-                        onViewScript={() => setViewingScript(job.slurm_script)}
+                        onViewScript={() => handleViewScript(job.id)}
                         onViewLogs={() => setViewingLogs({ id: job.id, name: job.name })}
                         onArchive={() => handleArchiveJob(job.id)}
                         onUnarchive={() => handleUnarchiveJob(job.id)}
@@ -81,11 +81,19 @@ export const refreshJobStatus = async (jobId) => {
   return response.data
 }
 
+export const refreshJobStatuses = async (jobIds) => {
+  const response = await api.post('/jobs/refresh-status/bulk', { job_ids: jobIds })
+  return response.data
+}
+
 export const getJobLogs = async (jobId) => {
   const response = await api.get(`/jobs/${jobId}/logs`)
   return response.data
 }
 
+// URL of the raw, streamed log (for opening in a new tab)
+export const getJobLogStreamUrl = (jobId) => `${API_BASE_URL}/jobs/${jobId}/logs/stream`
+
 export const archiveJob = async (jobId) => {
   const response = await api.post(`/jobs/${jobId}/archive`)
   return response.data
@@ -18,99 +18,151 @@ import re
 import json
 import argparse
 from collections import defaultdict
-from tabulate import tabulate
-import textwrap
 
 WRAP_WIDTH = 55
 EXCLUDE_STATES = {"DRAIN", "DRAINED", "DOWN"}
 
+GRES_RE = re.compile(r'(?:gres/gpu|gpu):?([A-Za-z0-9_-]+)?[:=]?(\d+)?')
+
 def parse_gres(gres: str) -> dict[str, int]:
     """Parse SLURM GRES string to extract GPU types and counts."""
     if not gres or gres == "N/A":
         return {}
     gpus = defaultdict(int)
-    for match in re.finditer(r'(?:gres/gpu|gpu):?([A-Za-z0-9_-]+)?[:=]?(\d+)?', gres):
-        model, count = match.groups()
-        gpus[model.lower() if model else 'gpu'] += int(count or 1)
+    # findall gives '' for a missing model or count
+    for model, count in GRES_RE.findall(gres):
+        gpus[model.lower() or 'gpu'] += int(count or 1)
     return dict(gpus)
 
+def parse_node_fields(line: str) -> dict[str, str]:
+    """Parse one `scontrol -o show node` record into {key: value}."""
+    fields = {}
+    for token in line.split():
+        key, sep, value = token.partition('=')
+        # Free-text values (Reason, OS) span several tokens; keep the first of each key
+        if sep:
+            fields.setdefault(key, value)
+    return fields
+
+def iter_node_records():
+    """Stream `scontrol -o show node` and yield each node's fields as scontrol prints them."""
+    with subprocess.Popen(["scontrol", "-o", "show", "node"], stdout=subprocess.PIPE, text=True) as proc:
+        for line in proc.stdout:
+            yield parse_node_fields(line)
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+
 def get_gpu_data():
     """
     Query SLURM for GPU availability data.
 
     Returns:
         tuple: (total_gpus, free_gpus, total_free, pending_gpus)
+        free_gpus maps each model to a list of (node_name, free_count)
     """
     total_gpus = defaultdict(int)
     free_gpus = defaultdict(list)
     pending_gpus = defaultdict(int)
+    total_free = 0
 
-    # Parse node data
+    # Parse node data while scontrol is still printing it
     try:
-        nodes = subprocess.check_output("scontrol show node", shell=True, text=True).strip().split('\n\n')
-    except subprocess.CalledProcessError:
+        for fields in iter_node_records():
+            node_name = fields.get('NodeName')
+            state = fields.get('State')
+            if not node_name or not state or EXCLUDE_STATES & set(state.split('+')):
+                continue
+
+            gres = parse_gres(fields.get('Gres'))
+            alloc = parse_gres(fields.get('AllocTRES'))
+
+            # Handle generic 'gpu' allocations
+            if 'gpu' in alloc:
+                generic_count = alloc['gpu']
+                # Check if we have specific model allocations
+                specific_models = {k: v for k, v in alloc.items() if k != 'gpu'}
+
+                if specific_models:
+                    # Babel case: has both generic and specific - remove generic (redundant)
+                    del alloc['gpu']
+                elif len(gres) == 1:
+                    # PSC case: only generic, map to the node's single GPU type
+                    model = list(gres.keys())[0]
+                    alloc[model] = generic_count
+                    del alloc['gpu']
+                # If multiple GPU types and only generic count, distribute proportionally
+                elif len(gres) > 1:
+                    for model, total in gres.items():
+                        alloc[model] = alloc.get(model, 0) + (generic_count * total // sum(gres.values()))
+                    del alloc['gpu']
+
+            for model, count in gres.items():
+                total_gpus[model] += count
+                free = count - alloc.get(model, 0)
+                if free > 0:
+                    free_gpus[model].append((node_name, free))
+                    total_free += free
+    except (subprocess.CalledProcessError, FileNotFoundError):
         return {}, {}, 0, {}
 
-    for node_block in nodes:
-        node = re.search(r'NodeName=(\S+)', node_block)
-        state = re.search(r'State=(\S+)', node_block)
-        if not node or not state or EXCLUDE_STATES & set(state.group(1).split('+')):
-            continue
-        node_name = node.group(1)
-
-        gres = parse_gres(re.search(r'Gres=(.*)', node_block).group(1)) if re.search(r'Gres=(.*)', node_block) else {}
-        alloc = parse_gres(re.search(r'AllocTRES=(.*)', node_block).group(1)) if re.search(r'AllocTRES=(.*)', node_block) else {}
-
-        # Handle generic 'gpu' allocations
-        if 'gpu' in alloc:
-            generic_count = alloc['gpu']
-            # Check if we have specific model allocations
-            specific_models = {k: v for k, v in alloc.items() if k != 'gpu'}
-
-            if specific_models:
-                # Babel case: has both generic and specific - remove generic (redundant)
-                del alloc['gpu']
-            elif len(gres) == 1:
-                # PSC case: only generic, map to the node's single GPU type
-                model = list(gres.keys())[0]
-                alloc[model] = generic_count
-                del alloc['gpu']
-            # If multiple GPU types and only generic count, distribute proportionally
-            elif len(gres) > 1:
-                for model, total in gres.items():
-                    alloc[model] = alloc.get(model, 0) + (generic_count * total // sum(gres.values()))
-                del alloc['gpu']
-
-        for model, count in gres.items():
-            total_gpus[model] += count
-            free = count - alloc.get(model, 0)
-            if free > 0:
-                free_gpus[model].append(f"{node_name}:{free}")
-
     # Parse pending jobs
     try:
-        jobs = subprocess.check_output('squeue --state=PD -a -o "%.18i %.2t %.25R %.20b" --noheader', shell=True, text=True).strip().splitlines()
+        # '|'-separated reason and TRES per node, no fixed widths to truncate them
+        jobs = subprocess.check_output(
+            ["squeue", "--state=PD", "-a", "-o", "%r|%b", "--noheader"], text=True
+        ).splitlines()
         for job in jobs:
-            parts = job.split(maxsplit=3)
-            if len(parts) == 4 and parts[2].strip() in {"(Resources)", "(Priority)"}:
-                pending_gpus.update({k: v + pending_gpus[k] for k, v in parse_gres(parts[3]).items()})
-    except subprocess.CalledProcessError:
+            reason, _, tres = job.partition('|')
+            if reason in {"Resources", "Priority"}:
+                pending_gpus.update({k: v + pending_gpus[k] for k, v in parse_gres(tres).items()})
+    except (subprocess.CalledProcessError, FileNotFoundError):
         pass
 
-    total_free = sum(int(node.split(':')[1]) for nodes in free_gpus.values() for node in nodes)
     return total_gpus, free_gpus, total_free, pending_gpus
 
+def format_grid(rows, headers):
+    """Render rows as a grid table with multi-line cells; int columns are right-aligned."""
+    numeric = [all(isinstance(row[i], int) for row in rows) for i in range(len(headers))]
+    cells = [[str(value).split('\n') for value in row] for row in [headers, *rows]]
+    # Like tabulate, leave at least two spaces of slack next to each header
+    widths = [
+        max([len(headers[i]) + 2] + [len(line) for row in cells[1:] for line in row[i]])
+        for i in range(len(headers))
+    ]
+
+    def rule(char):
+        return '+' + '+'.join(char * (width + 2) for width in widths) + '+'
+
+    def render(row):
+        height = max(len(cell) for cell in row)
+        return [
+            '|' + '|'.join(
+                f" {cell[k] if k < len(cell) else '':{'>' if num else '<'}{width}} "
+                for cell, width, num in zip(row, widths, numeric)
+            ) + '|'
+            for k in range(height)
+        ]
+
+    lines = [rule('-'), *render(cells[0]), rule('=')]
+    for row in cells[1:]:
+        lines += render(row)
+        lines.append(rule('-'))
+    return '\n'.join(lines)
+
 def print_table(total_gpus, free_gpus, total_free, pending_gpus):
     """Print GPU availability in human-readable table format."""
+    # Imported here so the --json path used by the backend skips loading it
+    import textwrap
+
     table = []
     # Dynamically find all unique GPU models from the parsed data
     all_models = sorted(set(total_gpus.keys()) | set(pending_gpus.keys()))
 
     for model_lower in all_models:
         total = total_gpus.get(model_lower, 0)
-        free = sum(int(n.split(':')[1]) for n in free_gpus.get(model_lower, []))
+        free = sum(count for _, count in free_gpus.get(model_lower, []))
         pending = pending_gpus.get(model_lower, 0)
-        nodes = " ".join(sorted(free_gpus.get(model_lower, []))) or "None"
+        nodes = " ".join(sorted(f"{node}:{count}" for node, count in free_gpus.get(model_lower, []))) or "None"
         wrapped_nodes = "\n".join(textwrap.wrap(nodes, width=WRAP_WIDTH))
 
         # Use the found model name, capitalized for display
@@ -118,7 +170,7 @@ def print_table(total_gpus, free_gpus, total_free, pending_gpus):
         table.append([display_model, total, free, pending, wrapped_nodes])
 
     print(f"Total free GPUs: {total_free}")
-    print(tabulate(table, headers=["Model", "Total", "Free", "Pending", "Nodes with Free GPUs"], tablefmt="grid"))
+    print(format_grid(table, headers=["Model", "Total", "Free", "Pending", "Nodes with Free GPUs"]))
 
 def print_json(total_gpus, free_gpus, total_free, pending_gpus):
     """Print GPU availability in JSON format for API consumption."""
@@ -128,7 +180,7 @@ def print_json(total_gpus, free_gpus, total_free, pending_gpus):
 
     for model_lower in all_models:
         total = total_gpus.get(model_lower, 0)
-        free_count = sum(int(n.split(':')[1]) for n in free_gpus.get(model_lower, []))
+        free_count = sum(count for _, count in free_gpus.get(model_lower, []))
         pending = pending_gpus.get(model_lower, 0)
         in_use = total - free_count
 
@@ -141,14 +193,14 @@ def print_json(total_gpus, free_gpus, total_free, pending_gpus):
             "available": free_count,
             "in_use": in_use,
             "pending": pending,
-            "nodes_with_free": free_gpus.get(model_lower, [])
+            "nodes_with_free": [f"{node}:{count}" for node, count in free_gpus.get(model_lower, [])]
         })
 
     output = {
         "total_free_gpus": total_free,
         "gpus": gpus
     }
-    print(json.dumps(output, indent=2))
+    print(json.dumps(output, separators=(',', ':')))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Check GPU availability on SLURM cluster")